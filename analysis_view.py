@@ -0,0 +1,285 @@
+from functools import partial
+
+import streamlit as st
+
+from note_analyzer import EXPORT_MIME_TYPES
+
+# Texts of the analysis view for every language of the app
+ANALYSIS_TEXTS = {
+    "turkish": {
+        "language": "turkish",
+        "already_added": "Bu notlar zaten eklendi.",
+        "append_first": "Ekleme modu açık: notları eklemek için Analizi Çalıştır'a basın.",
+        "batches": "{batches} parti, toplam {count} not",
+        "malformed_token": "'{text}' (satır {line})",
+        "malformed": "{count} geçersiz değer atlandı: {skipped}",
+        "general_info": "Genel Bilgiler",
+        "stats": ("Katilimci Sayısı", "En Düşük Not", "En Yüksek Not", "Ortalama Not", "Standart Sapma", "Z-Skoru"),
+        "chart_title": "Not Dağılım Grafiği",
+        "drawing": "Grafik çiziliyor...",
+        "download_chart": "Grafiği İndir",
+        "chart_file": "not_dagilimi",
+        "download_table": "Öğrenci Tablosunu İndir (CSV)",
+        "table_file": "ogrenci_tablosu.csv",
+        "error": "Hata: {error}",
+        "diagnostics": "Tanılama",
+        "diagnostics_columns": ("Aşama", "Süre (ms)", "En Yüksek Bellek (KB)", "Girdi Boyutu", "Ayrıntılar"),
+        "download_diagnostics": "Tanılamayı İndir (JSON)",
+        "diagnostics_file": "tanilama.json",
+        "compare_malformed": "Geçersiz değerler atlandı: {skipped}",
+        "comparison": "Ders Karşılaştırması",
+        "course": "Ders",
+        "comparison_chart": "Not Dağılımlarının Karşılaştırması",
+        "unique_bins": "Dersler ortak eksenlerde her not için bir çubukla çizilemez, {width:g} genişliğindeki "
+                       "aralıklarla karşılaştırılıyor.",
+        "comparison_file": "ders_karsilastirmasi.png",
+    },
+    "english": {
+        "language": "english",
+        "already_added": "These scores were already added.",
+        "append_first": "Append mode is on: click Run Analysis to add these scores.",
+        "batches": "{batches} batches, {count} scores in total",
+        "malformed_token": "'{text}' (line {line})",
+        "malformed": "{count} invalid values were skipped: {skipped}",
+        "general_info": "General Information",
+        "stats": ("Number of Participants", "Lowest Score", "Highest Score", "Average Score", "Standard Deviation",
+                  "Z-Score"),
+        "chart_title": "Score Distribution Graph",
+        "drawing": "Drawing the graph...",
+        "download_chart": "Download Graph",
+        "chart_file": "score_distribution",
+        "download_table": "Download Student Table (CSV)",
+        "table_file": "student_table.csv",
+        "error": "Error: {error}",
+        "diagnostics": "Diagnostics",
+        "diagnostics_columns": ("Stage", "Time (ms)", "Peak Memory (KB)", "Input Size", "Details"),
+        "download_diagnostics": "Download Diagnostics (JSON)",
+        "diagnostics_file": "diagnostics.json",
+        "compare_malformed": "Invalid values were skipped: {skipped}",
+        "comparison": "Course Comparison",
+        "course": "Course",
+        "comparison_chart": "Score Distribution Comparison",
+        "unique_bins": "Courses on shared axes cannot have one bar per score, they are compared in bins of {width:g}.",
+        "comparison_file": "course_comparison.png",
+    },
+    "arabic": {
+        "language": "arabic",
+        "already_added": "تمت إضافة هذه الدرجات مسبقًا.",
+        "append_first": "وضع الإضافة مفعّل: اضغط على تشغيل التحليل لإضافة هذه الدرجات.",
+        "batches": "{batches} دفعات، إجمالي {count} درجة",
+        "malformed_token": "'{text}' (السطر {line})",
+        "malformed": "تم تخطي {count} من القيم غير الصالحة: {skipped}",
+        "general_info": "المعلومات العامة",
+        "stats": ("عدد المشاركين", "أقل درجة", "أعلى درجة", "متوسط الدرجات", "الانحراف المعياري", "درجة Z"),
+        "chart_title": "رسم توزيع الدرجات",
+        "drawing": "جارٍ رسم المخطط...",
+        "download_chart": "تحميل الرسم البياني",
+        "chart_file": "score_distribution",
+        "download_table": "تحميل جدول الطلاب (CSV)",
+        "table_file": "student_table.csv",
+        "error": "خطأ: {error}",
+        "diagnostics": "التشخيص",
+        "diagnostics_columns": ("المرحلة", "الزمن (مللي ثانية)", "أعلى استهلاك للذاكرة (كيلوبايت)", "حجم المدخلات",
+                                "التفاصيل"),
+        "download_diagnostics": "تنزيل التشخيص (JSON)",
+        "diagnostics_file": "diagnostics.json",
+        "compare_malformed": "تم تخطي قيم غير صالحة: {skipped}",
+        "comparison": "مقارنة المواد",
+        "course": "المادة",
+        "comparison_chart": "مقارنة توزيع الدرجات",
+        "unique_bins": "لا يمكن رسم عمود لكل درجة للمواد على محاور مشتركة، تتم المقارنة بفئات عرضها {width:g}.",
+        "comparison_file": "course_comparison.png",
+    },
+}
+
+
+def show_analysis(texts, *, uploaded_file, text_input, lecture_name, perfect_score, my_note, note_s_axis_diff,
+                  amount_s_axis_diff, first_step, increase_amount, histogram_mode, bin_width, chart_mode,
+                  export_format, append_mode, show_diagnostics, run_clicked):
+    """Analyze one grade set and show its statistics, chart and downloads.
+
+    Shared by every language of app.py and the single-language scripts;
+    ``texts`` is one entry of ``ANALYSIS_TEXTS`` and the other arguments
+    are the sidebar inputs.
+    """
+    language = texts["language"]
+    diagnostics = None
+    try:
+        # Heavy analysis modules are only loaded when an analysis runs
+        from note_analyzer import (TRACE_MEMORY, Diagnostics, ParseReport, RunningAnalysis, analyze_cached,
+                                   build_chart_spec, chunk_histogram, cohort_csv, export_chart, histogram_bars,
+                                   phase, submit_chart)
+
+        # With diagnostics on, the time and input size of every stage are measured, their memory only when
+        # the operator turned memory tracing on for the whole server
+        if show_diagnostics:
+            diagnostics = Diagnostics(trace_memory=TRACE_MEMORY).start()
+
+        # Read content from file or text area
+        with phase(diagnostics, "read") as detail:
+            if uploaded_file:
+                data, source_id = uploaded_file.getvalue(), uploaded_file.file_id
+            elif text_input:
+                data, source_id = text_input.encode("utf-8"), None
+            detail["input_size"] = len(data)
+
+        # Process the data
+        report = ParseReport()
+        if append_mode:
+            # Append mode: new scores are folded into the statistics and histogram kept in the session
+            if "running_analysis" not in st.session_state:
+                st.session_state.running_analysis = RunningAnalysis()
+            running = st.session_state.running_analysis
+            if run_clicked and not running.append(data, first_step, increase_amount, report=report,
+                                                  diagnostics=diagnostics):
+                st.info(texts["already_added"])
+            if not running.batches:
+                # Append mode was just switched on, nothing has been added yet
+                st.info(texts["append_first"])
+                return
+            stats = running.stats
+            values, counts = running.histogram(histogram_mode, bin_width, perfect_score)
+            st.caption(texts["batches"].format(batches=running.batches, count=stats.count))
+        else:
+            histogram = chunk_histogram(histogram_mode, bin_width, perfect_score)
+            # Same content and settings come from the cache, large files are parsed on all CPU cores
+            stats, values, counts = analyze_cached(data, first_step, increase_amount, report=report,
+                                                   histogram=histogram, source_id=source_id,
+                                                   diagnostics=diagnostics)
+
+        # Report the values that are not numbers
+        if report.malformed_count:
+            skipped = ", ".join(texts["malformed_token"].format(text=t.text, line=t.line)
+                                for t in report.malformed[:5])
+            st.warning(texts["malformed"].format(count=report.malformed_count, skipped=skipped))
+
+        # The chart starts rendering in a separate process now, the statistics below do not wait for it
+        with phase(diagnostics, "bars", len(values)):
+            bars = histogram_bars(histogram_mode, values, counts, bin_width, perfect_score)
+        if chart_mode != "browser":
+            chart = submit_chart(bars, stats, my_note, lecture_name, perfect_score, note_s_axis_diff,
+                                 amount_s_axis_diff, language, diagnostics=diagnostics)
+
+        # Display statistics
+        st.subheader(texts["general_info"])
+        participants, lowest, highest, average, std, z_score = texts["stats"]
+        st.write(f"{participants}: {stats.count}")
+        st.write(f"{lowest}: {stats.min:.2f}")
+        st.write(f"{highest}: {stats.max:.2f}")
+        st.write(f"{average}: {stats.mean:.2f}")
+        st.write(f"{std}: {stats.std:.2f}")
+        st.write(f"{z_score}: {stats.z_score(my_note):.2f}")
+
+        # Create plot
+        st.subheader(texts["chart_title"])
+        if chart_mode == "browser":
+            # Only the bar counts and the markers are sent, the browser draws the chart
+            with phase(diagnostics, "chart"):
+                st.vega_lite_chart(build_chart_spec(bars, stats, my_note, lecture_name, perfect_score,
+                                                    note_s_axis_diff, amount_s_axis_diff, language),
+                                   use_container_width=True)
+        else:
+            # A placeholder keeps the place of the chart until it is ready
+            chart_slot = st.empty()
+            chart_slot.caption(texts["drawing"])
+
+        # Download button for the plot
+        # The chosen format is only made when downloaded, the same graph comes from the cache
+        export, export_dpi = export_format
+        st.download_button(
+            label=texts["download_chart"],
+            data=partial(export_chart, bars, stats, my_note, lecture_name, perfect_score, note_s_axis_diff,
+                         amount_s_axis_diff, language, export, export_dpi),
+            file_name=f"{texts['chart_file']}.{export}",
+            mime=EXPORT_MIME_TYPES[export]
+        )
+
+        # Every student's z-score, percentile rank and letter band, computed only when downloaded
+        # The student table lists the scores of one data set, it is not offered in append mode
+        if not append_mode:
+            st.download_button(
+                label=texts["download_table"],
+                data=partial(cohort_csv, data, first_step, increase_amount, perfect_score, language),
+                file_name=texts["table_file"],
+                mime="text/csv"
+            )
+
+        # The chart fills its placeholder once it is ready
+        if chart_mode != "browser":
+            with phase(diagnostics, "chart"):
+                chart_slot.image(chart.result(), use_container_width=True)
+
+    except Exception as e:
+        st.error(texts["error"].format(error=e))
+    finally:
+        # Measured stages are shown and logged even when the analysis failed
+        if diagnostics is not None:
+            diagnostics.stop()
+            diagnostics.log(language=language)
+            stage, time, memory, size, details = texts["diagnostics_columns"]
+            with st.expander(texts["diagnostics"]):
+                st.table([
+                    {stage: r.name, time: round(r.seconds * 1000, 2),
+                     memory: None if r.peak_bytes is None else round(r.peak_bytes / 1024, 1),
+                     size: r.input_size,
+                     details: ", ".join(f"{key}={value}" for key, value in r.detail.items())}
+                    for r in diagnostics.records
+                ])
+                st.download_button(
+                    label=texts["download_diagnostics"],
+                    data=diagnostics.to_json(language=language),
+                    file_name=texts["diagnostics_file"],
+                    mime="application/json"
+                )
+
+
+def show_comparison(texts, *, compare_files, perfect_score, my_note, note_s_axis_diff, amount_s_axis_diff,
+                    first_step, increase_amount, histogram_mode, bin_width):
+    """Compare the grade sets of several uploaded files in one table and one chart.
+
+    Like ``show_analysis``, ``texts`` is one entry of ``ANALYSIS_TEXTS`` and
+    the other arguments are the sidebar inputs.
+    """
+    try:
+        # Heavy analysis modules are only loaded when an analysis runs
+        from note_analyzer import compare_courses, submit_comparison
+
+        # Every course is parsed once and then comes from the cache, all courses are binned in one batch
+        sources = [(f.name.rsplit(".", 1)[0], f.getvalue()) for f in compare_files]
+        comparison = compare_courses(sources, first_step, increase_amount, histogram_mode, bin_width,
+                                     perfect_score, source_ids=[f.file_id for f in compare_files])
+
+        # The chart starts rendering now, or comes from the cache when only my_note changed
+        chart = submit_comparison(comparison, perfect_score, note_s_axis_diff, amount_s_axis_diff,
+                                  texts["language"])
+
+        # Report values that could not be read as a score
+        skipped = ", ".join(f"{name} ({count})" for name, count in zip(comparison.names, comparison.malformed)
+                            if count)
+        if skipped:
+            st.warning(texts["compare_malformed"].format(skipped=skipped))
+
+        # Show the statistics of every course in a table
+        st.subheader(texts["comparison"])
+        participants, lowest, highest, average, std, z_score = texts["stats"]
+        st.table([
+            {texts["course"]: name, participants: s.count, lowest: round(s.min, 2), highest: round(s.max, 2),
+             average: round(s.mean, 2), std: round(s.std, 2), z_score: round(s.z_score(my_note), 2)}
+            for name, s in zip(comparison.names, comparison.stats)
+        ])
+
+        # The distributions are overlaid on shared axes
+        st.subheader(texts["comparison_chart"])
+        if histogram_mode == "unique":
+            st.caption(texts["unique_bins"].format(width=bin_width))
+        png = chart.result()
+        st.image(png, use_container_width=True)
+        st.download_button(
+            label=texts["download_chart"],
+            data=png,
+            file_name=texts["comparison_file"],
+            mime="image/png"
+        )
+
+    except Exception as e:
+        st.error(texts["error"].format(error=e))
@@ -1,8 +1,17 @@
+import threading
+
 import streamlit as st
-import re
-import numpy as np
-import matplotlib.pyplot as plt
-from io import BytesIO
+
+from analysis_view import ANALYSIS_TEXTS, show_analysis, show_comparison
+from note_analyzer import CHART_MODES, EXPORT_FORMATS, HISTOGRAM_MODES, tutorial_images, warm_up
+
+# Sunucu başına bir kez: grafik kütüphanesini ve yazı tipi önbelleğini arka planda hazırla
+# böylece ilk analiz bunu beklemek zorunda kalmaz
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    thread = threading.Thread(target=warm_up, daemon=True)
+    thread.start()
+    return thread
 
 def run_turkish():
     # Başlık
@@ -18,16 +27,20 @@ def run_turkish():
     # Dosya yükleme veya metin girişi seçimi
     input_method = st.sidebar.radio(
         "Notları nasıl gireceksiniz?",
-        options=["Dosya Yükle", "Kopyala-Yapıştır"]
+        options=["Dosya Yükle", "Kopyala-Yapıştır", "Dersleri Karşılaştır"]
     )
 
     uploaded_file = None
     text_input = None
+    compare_files = []
 
     if input_method == "Dosya Yükle":
         uploaded_file = st.sidebar.file_uploader("Notlar Dosyasını Yükleyin (TXT)", type=["txt"])
     elif input_method == "Kopyala-Yapıştır":
         text_input = st.sidebar.text_area("Notları Yapıştırın", height=200)
+    elif input_method == "Dersleri Karşılaştır":
+        # Karşılaştırma için birden fazla dosya
+        compare_files = st.sidebar.file_uploader("Karşılaştırılacak Not Dosyalarını Yükleyin (TXT)", type=["txt"], accept_multiple_files=True)
 
     # Diğer parametreler
     lecture_name = st.sidebar.text_input("Ders Adı", value="Ders Adı")
@@ -35,13 +48,42 @@ def run_turkish():
     my_note = st.sidebar.number_input("Benim Notum", value=0.0, step=0.1)
     note_s_axis_diff = st.sidebar.number_input("Notlar X Ekseni Ortak Farkı", value=5, step=1)
     amount_s_axis_diff = st.sidebar.number_input("Miktar Y Ekseni Ortak Farkı", value=1, step=1)
-    first_step = st.sidebar.number_input("İlk Adım", value=0, step=1)
-    increase_amount = st.sidebar.number_input("Artış Miktarı", value=1, step=1)
+    first_step = st.sidebar.number_input("İlk Adım", value=0, min_value=0, step=1)
+    increase_amount = st.sidebar.number_input("Artış Miktarı", value=1, min_value=1, step=1)
+    histogram_mode = st.sidebar.selectbox(
+        "Grafik Çubukları",
+        options=HISTOGRAM_MODES,
+        format_func={"unique": "Her not için bir çubuk", "fixed": "Sabit genişlikte aralıklar",
+                     "fd": "Freedman–Diaconis aralıkları", "perfect": "Sınav puanına hizalı aralıklar"}.get
+    )
+    bin_width = st.sidebar.number_input("Aralık Genişliği", value=1.0, min_value=0.01, step=0.5)
+    # Grafiğin sunucuda mı yoksa tarayıcıda mı çizileceği
+    chart_mode = st.sidebar.selectbox(
+        "Grafik Çizimi",
+        options=CHART_MODES,
+        format_func={"image": "Resim (sunucuda çizilir)", "browser": "Etkileşimli (tarayıcıda çizilir)"}.get
+    )
+    # İndirilen grafiğin biçimi ve çözünürlüğü
+    export_format = st.sidebar.selectbox(
+        "Grafik İndirme Biçimi",
+        options=EXPORT_FORMATS,
+        format_func=lambda option: f"PNG ({option[1]} dpi)" if option[1] else option[0].upper()
+    )
+    # Notları önceki analizlere ekleme
+    append_mode = st.sidebar.checkbox("Ekleme Modu (yeni notları öncekilere ekle)")
+    # Analizin her aşamasının süresini ve girdi boyutunu ölç; bellek ölçümünü yalnızca sunucu yöneticisi açar
+    show_diagnostics = st.sidebar.checkbox("Tanılama (her aşamanın süresi ve girdi boyutu)")
 
-    if st.sidebar.button("Analizi Çalıştır"):
+    run_clicked = st.sidebar.button("Analizi Çalıştır")
+    if run_clicked:
         # Butona basıldığında resimleri gizle
         st.session_state.show_images = False
 
+    # Ekleme modunda biriken notları temizleme
+    if append_mode and st.sidebar.button("Eklenen Notları Sıfırla"):
+        st.session_state.pop("running_analysis", None)
+        st.session_state.show_images = True
+
     # Resimler yalnızca show_images True ise gösterilir
     if st.session_state.show_images:
         st.subheader("Uygulamanın Çalışma Prensibi")
@@ -50,8 +92,9 @@ def run_turkish():
         image_files = ["turkish/a.png", "turkish/b.png", "turkish/c.png", "turkish/d.png"]
 
         # Resimleri alt alta ekle
-        for image_file in image_files:
-            st.image(image_file, use_container_width=True)
+        # Resimler süreç başına bir kez okunup sıkıştırılır, sonra bellekten gösterilir
+        for image in tutorial_images(image_files):
+            st.image(image, use_container_width=True)
 
     # Notları yükleme ve işleme işlemleri (Butona basıldıysa çalışır)
     if not st.session_state.show_images:
@@ -59,107 +102,22 @@ def run_turkish():
             st.error("Lütfen bir dosya yükleyin!")
         elif input_method == "Kopyala-Yapıştır" and not text_input:
             st.error("Lütfen notları metin kutusuna yapıştırın!")
+        elif input_method == "Dersleri Karşılaştır" and len(compare_files) < 2:
+            st.error("Lütfen karşılaştırmak için en az iki dosya yükleyin!")
+        elif input_method == "Dersleri Karşılaştır":
+            # Derslerin karşılaştırılması tüm diller için ortaktır
+            show_comparison(ANALYSIS_TEXTS["turkish"], compare_files=compare_files, perfect_score=perfect_score,
+                            my_note=my_note, note_s_axis_diff=note_s_axis_diff,
+                            amount_s_axis_diff=amount_s_axis_diff, first_step=first_step,
+                            increase_amount=increase_amount, histogram_mode=histogram_mode, bin_width=bin_width)
         else:
-            try:
-                # Dosya veya metin kutusundan içerik okuma
-                if uploaded_file:
-                    content = uploaded_file.read().decode("utf-8")
-                elif text_input:
-                    content = text_input
-
-                # Veriyi işleme
-                result = re.split(r'[ \n]+', content)
-
-                # Strip fonksiyonu ve kaçış dizisi temizliği
-                notes_result = [x.strip() for x in result[first_step::increase_amount] if x.strip() != '∅' and x.strip() != "NA"]
-                notes_result = list(map(lambda x: float(x), notes_result))
-                notes_result = np.array(notes_result)
-
-                # İstatistikler
-                average_x = np.average(notes_result)
-                min_x = notes_result.min()
-                max_x = notes_result.max()
-                std = np.std(notes_result)
-                z_score = (my_note - average_x) / std
-
-                # İstatistikleri ekrana yazdırma
-                st.subheader("Genel Bilgiler")
-                st.write(f"Katilimci Sayısı: {len(notes_result)}")
-                st.write(f"En Düşük Not: {min_x:.2f}")
-                st.write(f"En Yüksek Not: {max_x:.2f}")
-                st.write(f"Ortalama Not: {average_x:.2f}")
-                st.write(f"Standart Sapma: {std:.2f}")
-                st.write(f"Z-Skoru: {z_score:.2f}")
-
-                # Grafik oluşturma
-                st.subheader("Not Dağılım Grafiği")
-                unique_values, counts = np.unique(notes_result, return_counts=True)
-                plt.figure(figsize=(10, 6))
-                bars = plt.bar(unique_values, counts, width=0.3)
-                plt.axvline(x=average_x, color='red', linestyle='--')
-                plt.text(average_x + 1.5, max(counts), 'Ortalama Not', color='red', rotation=0, ha='center', va='bottom')
-
-                if my_note in unique_values:
-                    plt.text(my_note, counts[unique_values == my_note][0], 'Benim\nNotum', color='green', rotation=0, ha='center', va='bottom')
-
-                for bar in bars:
-                    if bar.get_x() <= my_note < bar.get_x() + bar.get_width():
-                        bar.set_color('green')
-
-                plt.title(f'{lecture_name} Not Sayıları Grafiği')
-                plt.xlabel('Notlar')
-                plt.ylabel('Adet')
-                plt.xticks(range(0, int(perfect_score), note_s_axis_diff), rotation=90)
-                plt.yticks(range(0, max(counts), amount_s_axis_diff), rotation=0)
-
-                # Grafik bilgileri
-                info_text = (
-                    f"Katilimci sayısı: {len(notes_result)}\n"
-                    f"En düşük not: {min_x:.2f}\n"
-                    f"En yüksek not: {max_x:.2f}\n"
-                    f"Benim notum: {my_note:.2f}\n"
-                    f"Ortalama not: {average_x:.2f}\n"
-                    f"Standart sapma: {std:.2f}\n"
-                    f"Z-skoru: {z_score:.2f}"
-                )
-                plt.text(
-                    1.05 * max(unique_values), 0.8 * max(counts),
-                    info_text,
-                    fontsize=10,
-                    color="black",
-                    ha="left",
-                    va="top",
-                    bbox=dict(boxstyle="round,pad=0.3", edgecolor="blue", facecolor="lightgrey")
-                )
-                plt.subplots_adjust(left=0.055, bottom=0.065, right=0.90, top=0.962, wspace=0.2, hspace=0.2)
-                
-                # Sağ alt köşeye "Generated by Note Analyzer" metni ekle
-                plt.text(
-                    0.99, -0.15,  # Sağ alt köşeye konumlandır
-                    "Generated by Note Analyzer at HuggingFace aliicemill/NoteAnalyzer space",
-                    fontsize=8,
-                    color="gray",
-                    ha="right",
-                    va="top",
-                    transform=plt.gca().transAxes  # Koordinatları grafiğe göre ayarla
-                )
-
-                # Grafik gösterimi
-                st.pyplot(plt)
-
-                # Grafik indirme bağlantısı
-                buf = BytesIO()
-                plt.savefig(buf, format="png")
-                buf.seek(0)
-                st.download_button(
-                    label="Grafiği İndir",
-                    data=buf,
-                    file_name="not_dagilimi.png",
-                    mime="image/png"
-                )
-
-            except Exception as e:
-                st.error(f"Hata: {e}")
+            # Tek bir not setinin analizi tüm diller için ortaktır
+            show_analysis(ANALYSIS_TEXTS["turkish"], uploaded_file=uploaded_file, text_input=text_input,
+                          lecture_name=lecture_name, perfect_score=perfect_score, my_note=my_note,
+                          note_s_axis_diff=note_s_axis_diff, amount_s_axis_diff=amount_s_axis_diff,
+                          first_step=first_step, increase_amount=increase_amount, histogram_mode=histogram_mode,
+                          bin_width=bin_width, chart_mode=chart_mode, export_format=export_format,
+                          append_mode=append_mode, show_diagnostics=show_diagnostics, run_clicked=run_clicked)
 
     # Web sayfasının altına isim ve tarih
     st.markdown("---")
@@ -189,16 +147,20 @@ def run_arabic():
     # اختيار رفع ملف أو إدخال النصوص يدويًا
     input_method = st.sidebar.radio(
         "كيف ستقدم الدرجات؟",
-        options=["رفع ملف", "نسخ ولصق"]
+        options=["رفع ملف", "نسخ ولصق", "مقارنة المواد"]
     )
 
     uploaded_file = None
     text_input = None
+    compare_files = []
 
     if input_method == "رفع ملف":
         uploaded_file = st.sidebar.file_uploader("قم برفع ملف الدرجات (TXT)", type=["txt"])
     elif input_method == "نسخ ولصق":
         text_input = st.sidebar.text_area("قم بلصق الدرجات هنا", height=200)
+    elif input_method == "مقارنة المواد":
+        # عدة ملفات للمقارنة
+        compare_files = st.sidebar.file_uploader("قم برفع ملفات الدرجات للمقارنة (TXT)", type=["txt"], accept_multiple_files=True)
 
     # المعلمات الأخرى
     lecture_name = st.sidebar.text_input("اسم المادة", value="اسم المادة")
@@ -206,13 +168,42 @@ def run_arabic():
     my_note = st.sidebar.number_input("درجتي", value=0.0, step=0.1)
     note_s_axis_diff = st.sidebar.number_input("حجم خطوات المحور السيني للدرجات", value=5, step=1)
     amount_s_axis_diff = st.sidebar.number_input("حجم خطوات المحور الصادي للتكرار", value=1, step=1)
-    first_step = st.sidebar.number_input("الخطوة الأولى", value=0, step=1)
-    increase_amount = st.sidebar.number_input("مقدار الزيادة", value=1, step=1)
+    first_step = st.sidebar.number_input("الخطوة الأولى", value=0, min_value=0, step=1)
+    increase_amount = st.sidebar.number_input("مقدار الزيادة", value=1, min_value=1, step=1)
+    histogram_mode = st.sidebar.selectbox(
+        "أعمدة الرسم البياني",
+        options=HISTOGRAM_MODES,
+        format_func={"unique": "عمود لكل درجة", "fixed": "فئات بعرض ثابت",
+                     "fd": "فئات فريدمان-دياكونيس", "perfect": "فئات محاذية للدرجة الكاملة"}.get
+    )
+    bin_width = st.sidebar.number_input("عرض الفئة", value=1.0, min_value=0.01, step=0.5)
+    # رسم المخطط على الخادم أو في المتصفح
+    chart_mode = st.sidebar.selectbox(
+        "طريقة رسم المخطط",
+        options=CHART_MODES,
+        format_func={"image": "صورة (تُرسم على الخادم)", "browser": "تفاعلي (يُرسم في المتصفح)"}.get
+    )
+    # صيغة الرسم البياني المُنزَّل ودقته
+    export_format = st.sidebar.selectbox(
+        "صيغة تنزيل الرسم البياني",
+        options=EXPORT_FORMATS,
+        format_func=lambda option: f"PNG ({option[1]} dpi)" if option[1] else option[0].upper()
+    )
+    # إضافة الدرجات إلى التحليلات السابقة
+    append_mode = st.sidebar.checkbox("وضع الإضافة (إضافة الدرجات الجديدة إلى السابقة)")
+    # قياس زمن وحجم مدخلات كل مرحلة من التحليل؛ لا يُقاس استهلاك الذاكرة إلا إذا فعّله مشغّل الخادم
+    show_diagnostics = st.sidebar.checkbox("التشخيص (زمن وحجم مدخلات كل مرحلة)")
 
-    if st.sidebar.button("تشغيل التحليل"):
+    run_clicked = st.sidebar.button("تشغيل التحليل")
+    if run_clicked:
         # إخفاء الصور عند النقر على الزر
         st.session_state.show_images = False
 
+    # مسح الدرجات المجمعة في وضع الإضافة
+    if append_mode and st.sidebar.button("إعادة تعيين الدرجات المضافة"):
+        st.session_state.pop("running_analysis", None)
+        st.session_state.show_images = True
+
     # عرض الصور فقط إذا كانت show_images صحيحة
     if st.session_state.show_images:
         st.subheader("كيفية عمل التطبيق")
@@ -221,8 +212,9 @@ def run_arabic():
         image_files = ["arabic/a.png", "arabic/b.png", "arabic/c.png", "arabic/d.png"]
 
         # عرض الصور واحدة تحت الأخرى
-        for image_file in image_files:
-            st.image(image_file, use_container_width=True)
+        # تُقرأ الصور وتُضغط مرة واحدة لكل عملية ثم تُعرض من الذاكرة
+        for image in tutorial_images(image_files):
+            st.image(image, use_container_width=True)
 
     # تحميل ومعالجة الدرجات (يعمل فقط إذا تم النقر على الزر)
     if not st.session_state.show_images:
@@ -230,105 +222,22 @@ def run_arabic():
             st.error("يرجى رفع ملف!")
         elif input_method == "نسخ ولصق" and not text_input:
             st.error("يرجى لصق الدرجات في مربع النص!")
+        elif input_method == "مقارنة المواد" and len(compare_files) < 2:
+            st.error("يرجى رفع ملفين على الأقل للمقارنة!")
+        elif input_method == "مقارنة المواد":
+            # مقارنة عدة مواد مشتركة بين جميع اللغات
+            show_comparison(ANALYSIS_TEXTS["arabic"], compare_files=compare_files, perfect_score=perfect_score,
+                            my_note=my_note, note_s_axis_diff=note_s_axis_diff,
+                            amount_s_axis_diff=amount_s_axis_diff, first_step=first_step,
+                            increase_amount=increase_amount, histogram_mode=histogram_mode, bin_width=bin_width)
         else:
-            try:
-                # قراءة المحتوى من الملف أو مربع النص
-                if uploaded_file:
-                    content = uploaded_file.read().decode("utf-8")
-                elif text_input:
-                    content = text_input
-
-                # معالجة البيانات
-                result = re.split(r'[ \n]+', content)
-
-                # تنظيف وتصنيف البيانات
-                notes_result = [x.strip() for x in result[first_step::increase_amount] if x.strip() != '∅' and x.strip() != "NA"]
-                notes_result = list(map(lambda x: float(x), notes_result))
-                notes_result = np.array(notes_result)
-
-                # الإحصائيات
-                average_x = np.average(notes_result)
-                min_x = notes_result.min()
-                max_x = notes_result.max()
-                std = np.std(notes_result)
-                z_score = (my_note - average_x) / std
-
-                # عرض الإحصائيات
-                st.subheader("المعلومات العامة")
-                st.write(f"عدد المشاركين: {len(notes_result)}")
-                st.write(f"أقل درجة: {min_x:.2f}")
-                st.write(f"أعلى درجة: {max_x:.2f}")
-                st.write(f"متوسط الدرجات: {average_x:.2f}")
-                st.write(f"الانحراف المعياري: {std:.2f}")
-                st.write(f"درجة Z: {z_score:.2f}")
-
-                # إنشاء الرسم البياني
-                st.subheader("رسم توزيع الدرجات")
-                unique_values, counts = np.unique(notes_result, return_counts=True)
-                plt.figure(figsize=(10, 6))
-                bars = plt.bar(unique_values, counts, width=0.3)
-                plt.axvline(x=average_x, color='red', linestyle='--')
-                plt.text(average_x + 1.5, max(counts), 'متوسط الدرجات', color='red', rotation=0, ha='center', va='bottom')
-
-                if my_note in unique_values:
-                    plt.text(my_note, counts[unique_values == my_note][0], 'درجتي', color='green', rotation=0, ha='center', va='bottom')
-
-                for bar in bars:
-                    if bar.get_x() <= my_note < bar.get_x() + bar.get_width():
-                        bar.set_color('green')
-
-                plt.title(f'رسم توزيع الدرجات لمادة {lecture_name}')
-                plt.xlabel('الدرجات')
-                plt.ylabel('التكرار')
-                plt.xticks(range(0, int(perfect_score), note_s_axis_diff), rotation=90)
-                plt.yticks(range(0, max(counts), amount_s_axis_diff), rotation=0)
-
-                # إضافة معلومات إلى الرسم البياني
-                info_text = (
-                    f"عدد المشاركين: {len(notes_result)}\n"
-                    f"أقل درجة: {min_x:.2f}\n"
-                    f"أعلى درجة: {max_x:.2f}\n"
-                    f"درجتي: {my_note:.2f}\n"
-                    f"متوسط الدرجات: {average_x:.2f}\n"
-                    f"الانحراف المعياري: {std:.2f}\n"
-                    f"درجة Z: {z_score:.2f}"
-                )
-                plt.text(
-                    1.05 * max(unique_values), 0.8 * max(counts),
-                    info_text,
-                    fontsize=10,
-                    color="black",
-                    ha="left",
-                    va="top",
-                    bbox=dict(boxstyle="round,pad=0.3", edgecolor="blue", facecolor="lightgrey")
-                )
-                plt.subplots_adjust(left=0.055, bottom=0.065, right=0.90, top=0.962, wspace=0.2, hspace=0.2)
-                # Sağ alt köşeye "Generated by Note Analyzer" metni ekle
-                plt.text(
-                    0.99, -0.15,  # Sağ alt köşeye konumlandır
-                    "Generated by Note Analyzer at HuggingFace aliicemill/NoteAnalyzer space",
-                    fontsize=8,
-                    color="gray",
-                    ha="right",
-                    va="top",
-                    transform=plt.gca().transAxes  # Koordinatları grafiğe göre ayarla
-                )
-                # عرض الرسم البياني
-                st.pyplot(plt)
-
-                # زر لتحميل الرسم البياني
-                buf = BytesIO()
-                plt.savefig(buf, format="png")
-                buf.seek(0)
-                st.download_button(
-                    label="تحميل الرسم البياني",
-                    data=buf,
-                    file_name="score_distribution.png",
-                    mime="image/png"
-                )
-
-            except Exception as e:
-                st.error(f"خطأ: {e}")
+            # تحليل مجموعة درجات واحدة مشترك بين جميع اللغات
+            show_analysis(ANALYSIS_TEXTS["arabic"], uploaded_file=uploaded_file, text_input=text_input,
+                          lecture_name=lecture_name, perfect_score=perfect_score, my_note=my_note,
+                          note_s_axis_diff=note_s_axis_diff, amount_s_axis_diff=amount_s_axis_diff,
+                          first_step=first_step, increase_amount=increase_amount, histogram_mode=histogram_mode,
+                          bin_width=bin_width, chart_mode=chart_mode, export_format=export_format,
+                          append_mode=append_mode, show_diagnostics=show_diagnostics, run_clicked=run_clicked)
 
     # التذييل
     st.markdown("---")
@@ -358,16 +267,20 @@ def run_english():
     # File upload or text input selection
     input_method = st.sidebar.radio(
         "How will you provide the notes?",
-        options=["Upload File", "Copy-Paste"]
+        options=["Upload File", "Copy-Paste", "Compare Courses"]
     )
 
     uploaded_file = None
     text_input = None
+    compare_files = []
 
     if input_method == "Upload File":
         uploaded_file = st.sidebar.file_uploader("Upload the Notes File (TXT)", type=["txt"])
     elif input_method == "Copy-Paste":
         text_input = st.sidebar.text_area("Paste the Notes Here", height=200)
+    elif input_method == "Compare Courses":
+        # Several files for the comparison
+        compare_files = st.sidebar.file_uploader("Upload the Notes Files to Compare (TXT)", type=["txt"], accept_multiple_files=True)
 
     # Other parameters
     lecture_name = st.sidebar.text_input("Course Name", value="Course Name")
@@ -375,13 +288,42 @@ def run_english():
     my_note = st.sidebar.number_input("My Score", value=0.0, step=0.1)
     note_s_axis_diff = st.sidebar.number_input("Score X-Axis Step Size", value=5, step=1)
     amount_s_axis_diff = st.sidebar.number_input("Frequency Y-Axis Step Size", value=1, step=1)
-    first_step = st.sidebar.number_input("First Step", value=0, step=1)
-    increase_amount = st.sidebar.number_input("Step Increase", value=1, step=1)
+    first_step = st.sidebar.number_input("First Step", value=0, min_value=0, step=1)
+    increase_amount = st.sidebar.number_input("Step Increase", value=1, min_value=1, step=1)
+    histogram_mode = st.sidebar.selectbox(
+        "Chart Bars",
+        options=HISTOGRAM_MODES,
+        format_func={"unique": "One bar per score", "fixed": "Fixed-width bins",
+                     "fd": "Freedman–Diaconis bins", "perfect": "Bins aligned to the maximum score"}.get
+    )
+    bin_width = st.sidebar.number_input("Bin Width", value=1.0, min_value=0.01, step=0.5)
+    # Whether the chart is drawn on the server or in the browser
+    chart_mode = st.sidebar.selectbox(
+        "Chart Rendering",
+        options=CHART_MODES,
+        format_func={"image": "Image (drawn on the server)", "browser": "Interactive (drawn in the browser)"}.get
+    )
+    # Format and resolution of the downloaded graph
+    export_format = st.sidebar.selectbox(
+        "Graph Download Format",
+        options=EXPORT_FORMATS,
+        format_func=lambda option: f"PNG ({option[1]} dpi)" if option[1] else option[0].upper()
+    )
+    # Add the scores to the previous analyses
+    append_mode = st.sidebar.checkbox("Append Mode (add new scores to the previous ones)")
+    # Measure the time and input size of every stage; memory is only traced when the operator turns it on
+    show_diagnostics = st.sidebar.checkbox("Diagnostics (time and input size of every stage)")
 
-    if st.sidebar.button("Run Analysis"):
+    run_clicked = st.sidebar.button("Run Analysis")
+    if run_clicked:
         # Hide images when the button is clicked
         st.session_state.show_images = False
 
+    # Clear the scores collected in append mode
+    if append_mode and st.sidebar.button("Reset Appended Scores"):
+        st.session_state.pop("running_analysis", None)
+        st.session_state.show_images = True
+
     # Show images only if show_images is True
     if st.session_state.show_images:
         st.subheader("How the Application Works")
@@ -390,8 +332,9 @@ def run_english():
         image_files = ["english/a.png", "english/b.png", "english/c.png", "english/d.png"]
 
         # Display images one below the other
-        for image_file in image_files:
-            st.image(image_file, use_container_width=True)
+        # Images are read and compressed once per process, then served from memory
+        for image in tutorial_images(image_files):
+            st.image(image, use_container_width=True)
 
     # Load and process notes (Only works if the button is clicked)
     if not st.session_state.show_images:
@@ -399,106 +342,22 @@ def run_english():
             st.error("Please upload a file!")
         elif input_method == "Copy-Paste" and not text_input:
             st.error("Please paste the notes into the text area!")
+        elif input_method == "Compare Courses" and len(compare_files) < 2:
+            st.error("Please upload at least two files to compare!")
+        elif input_method == "Compare Courses":
+            # The comparison of several courses is shared by every language
+            show_comparison(ANALYSIS_TEXTS["english"], compare_files=compare_files, perfect_score=perfect_score,
+                            my_note=my_note, note_s_axis_diff=note_s_axis_diff,
+                            amount_s_axis_diff=amount_s_axis_diff, first_step=first_step,
+                            increase_amount=increase_amount, histogram_mode=histogram_mode, bin_width=bin_width)
         else:
-            try:
-                # Read content from file or text area
-                if uploaded_file:
-                    content = uploaded_file.read().decode("utf-8")
-                elif text_input:
-                    content = text_input
-
-                # Process the data
-                result = re.split(r'[ \n]+', content)
-
-                # Clean and filter the data
-                notes_result = [x.strip() for x in result[first_step::increase_amount] if x.strip() != '∅' and x.strip() != "NA"]
-                notes_result = list(map(lambda x: float(x), notes_result))
-                notes_result = np.array(notes_result)
-
-                # Statistics
-                average_x = np.average(notes_result)
-                min_x = notes_result.min()
-                max_x = notes_result.max()
-                std = np.std(notes_result)
-                z_score = (my_note - average_x) / std
-
-                # Display statistics
-                st.subheader("General Information")
-                st.write(f"Number of Participants: {len(notes_result)}")
-                st.write(f"Lowest Score: {min_x:.2f}")
-                st.write(f"Highest Score: {max_x:.2f}")
-                st.write(f"Average Score: {average_x:.2f}")
-                st.write(f"Standard Deviation: {std:.2f}")
-                st.write(f"Z-Score: {z_score:.2f}")
-
-                # Create plot
-                st.subheader("Score Distribution Graph")
-                unique_values, counts = np.unique(notes_result, return_counts=True)
-                plt.figure(figsize=(10, 6))
-                bars = plt.bar(unique_values, counts, width=0.3)
-                plt.axvline(x=average_x, color='red', linestyle='--')
-                plt.text(average_x + 1.5, max(counts), 'Average Score', color='red', rotation=0, ha='center', va='bottom')
-
-                if my_note in unique_values:
-                    plt.text(my_note, counts[unique_values == my_note][0], 'My\nScore', color='green', rotation=0, ha='center', va='bottom')
-
-                for bar in bars:
-                    if bar.get_x() <= my_note < bar.get_x() + bar.get_width():
-                        bar.set_color('green')
-
-                plt.title(f'{lecture_name} Score Distribution')
-                plt.xlabel('Scores')
-                plt.ylabel('Count')
-                plt.xticks(range(0, int(perfect_score), note_s_axis_diff), rotation=90)
-                plt.yticks(range(0, max(counts), amount_s_axis_diff), rotation=0)
-
-                # Add graph information
-                info_text = (
-                    f"Number of participants: {len(notes_result)}\n"
-                    f"Lowest score: {min_x:.2f}\n"
-                    f"Highest score: {max_x:.2f}\n"
-                    f"My score: {my_note:.2f}\n"
-                    f"Average score: {average_x:.2f}\n"
-                    f"Standard deviation: {std:.2f}\n"
-                    f"Z-score: {z_score:.2f}"
-                )
-                plt.text(
-                    1.05 * max(unique_values), 0.8 * max(counts),
-                    info_text,
-                    fontsize=10,
-                    color="black",
-                    ha="left",
-                    va="top",
-                    bbox=dict(boxstyle="round,pad=0.3", edgecolor="blue", facecolor="lightgrey")
-                )
-                plt.subplots_adjust(left=0.055, bottom=0.065, right=0.90, top=0.962, wspace=0.2, hspace=0.2)
-                # Sağ alt köşeye "Generated by Note Analyzer" metni ekle
-                plt.text(
-                    0.99, -0.15,  # Sağ alt köşeye konumlandır
-                    "Generated by Note Analyzer at HuggingFace aliicemill/NoteAnalyzer space",
-                    fontsize=8,
-                    color="gray",
-                    ha="right",
-                    va="top",
-                    transform=plt.gca().transAxes  # Koordinatları grafiğe göre ayarla
-                )
-
-                # Display the plot
-                st.pyplot(plt)
-
-                # Download button for the plot
-                buf = BytesIO()
-                plt.savefig(buf, format="png")
-                buf.seek(0)
-                st.download_button(
-                    label="Download Graph",
-                    data=buf,
-                    file_name="score_distribution.png",
-                    mime="image/png"
-                )
-
-            except Exception as e:
-                st.error(f"Error: {e}")
+            # The analysis of one grade set is shared by every language
+            show_analysis(ANALYSIS_TEXTS["english"], uploaded_file=uploaded_file, text_input=text_input,
+                          lecture_name=lecture_name, perfect_score=perfect_score, my_note=my_note,
+                          note_s_axis_diff=note_s_axis_diff, amount_s_axis_diff=amount_s_axis_diff,
+                          first_step=first_step, increase_amount=increase_amount, histogram_mode=histogram_mode,
+                          bin_width=bin_width, chart_mode=chart_mode, export_format=export_format,
+                          append_mode=append_mode, show_diagnostics=show_diagnostics, run_clicked=run_clicked)
 
     # Footer
     st.markdown("---")
@@ -513,30 +372,37 @@ def run_english():
         </p>
         """, unsafe_allow_html=True)
 
-# Session State'i başlat
-if "language" not in st.session_state:
-    st.session_state.language = None
-
-# Dil seçimi ekranı
-if st.session_state.language is None:
-    st.title("Select language / Dili seçin / اختر اللغة")
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        if st.button("Türkçe"):
-            st.session_state.language = "turkish"
-    with col2:
-        if st.button("English"):
-            st.session_state.language = "english"
-    with col3:
-        if st.button("عربي"):
-            st.session_state.language = "arabic"
-
-# Seçilen dilin programını çalıştır
-else:
-    if st.session_state.language == "turkish":
-        run_turkish()
-    elif st.session_state.language == "english":
-        run_english()
-    elif st.session_state.language == "arabic":
-        run_arabic()
+def main():
+    # Session State'i başlat
+    if "language" not in st.session_state:
+        st.session_state.language = None
+
+    # Dil seçimi ekranı
+    if st.session_state.language is None:
+        st.title("Select language / Dili seçin / اختر اللغة")
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            if st.button("Türkçe"):
+                st.session_state.language = "turkish"
+        with col2:
+            if st.button("English"):
+                st.session_state.language = "english"
+        with col3:
+            if st.button("عربي"):
+                st.session_state.language = "arabic"
+
+    # Seçilen dilin programını çalıştır
+    else:
+        if st.session_state.language == "turkish":
+            run_turkish()
+        elif st.session_state.language == "english":
+            run_english()
+        elif st.session_state.language == "arabic":
+            run_arabic()
+
+# Sayfa yalnızca streamlit run ile çizilir. İşçi süreçleri bu dosyayı __mp_main__ adıyla yeniden
+# çalıştırır, onlar ne sayfayı çizer ne de hazırlık başlatır. Hazırlık sayfa çizildikten sonra başlar
+if __name__ == "__main__":
+    main()
+    start_warm_up()
@@ -0,0 +1,67 @@
+"""Import-time budget of the language selection screen.
+
+Every case is imported in a fresh interpreter, timed a few times and
+checked against its budget. The first screen may not load NumPy or
+matplotlib at all. Exits with status 1 when a budget is exceeded.
+
+    python benchmarks/import_time.py [--runs N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("numpy", "matplotlib")
+
+# name, statement, budget in milliseconds, may load HEAVY_MODULES
+CASES = [
+    ("first screen", "from note_analyzer import HISTOGRAM_MODES, tutorial_images, warm_up", 25, False),
+    ("analysis", "from note_analyzer import ParseReport, analyze_cached, chunk_histogram, histogram_bars", 400, True),
+    ("charts", "from note_analyzer import submit_chart", 1500, True),
+]
+
+# Streamlit is imported before the clock starts, the app always needs it
+_PROBE = """
+import json, sys, time
+import streamlit
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement, runs):
+    """Return the fastest import time in ms and the heavy modules it loaded."""
+    code = _PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    best, loaded = None, []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result["ms"] < best:
+            best = result["ms"]
+        loaded = result["loaded"]
+    return best, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per case (default 5)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, statement, budget, heavy_allowed in CASES:
+        ms, loaded = measure(statement, args.runs)
+        ok = ms <= budget and (heavy_allowed or not loaded)
+        failed |= not ok
+        extra = f"  loads {', '.join(loaded)}" if loaded else ""
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<13} {ms:8.1f} ms  (budget {budget} ms){extra}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
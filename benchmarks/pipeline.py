@@ -0,0 +1,190 @@
+"""Per-phase benchmark of the analysis pipeline on synthetic grade files.
+
+Every case writes a grade file of the given number of tokens, decimal
+precision, share of missing-value markers and row layout, then times each
+phase of the app's pipeline separately (best of --repeat runs) and measures
+the peak memory each phase allocates in a separate traced run.
+
+    python benchmarks/pipeline.py --sizes 1e3 1e5 1e7 --output before.json
+    python benchmarks/pipeline.py --output after.json --compare before.json
+
+Results are written as JSON; --compare prints the time ratio of every phase
+against an earlier result file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+import matplotlib
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from note_analyzer import MISSING_VALUES, NoteStatistics, analyze_stream, build_figure, figure_png  # noqa: E402
+from note_analyzer import histogram_bars, new_figure, note_histogram, tokenize_notes  # noqa: E402
+from note_analyzer.parsing import _convert_decimals, _stride_start, _token_bounds  # noqa: E402
+
+# Grades are generated and written this many rows at a time
+_ROWS_PER_BLOCK = 1 << 20
+
+
+def write_grades(path, tokens, precision, sentinel_share, stride, seed=0):
+    """Write a synthetic grade file of about ``tokens`` tokens and return its row count.
+
+    With ``stride`` > 1 every row is ``<id> S<id> ... <grade>``, ``stride``
+    tokens with the grade last, like an exported class list.
+    """
+    rng = np.random.default_rng(seed)
+    rows = max(1, int(tokens) // stride)
+    fmt = f"{{:.{precision}f}}"
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for start in range(0, rows, _ROWS_PER_BLOCK):
+            count = min(_ROWS_PER_BLOCK, rows - start)
+            grades = [fmt.format(v) for v in np.clip(rng.normal(60, 15, count), 0, 100).tolist()]
+            for i in np.flatnonzero(rng.random(count) < sentinel_share).tolist():
+                grades[i] = MISSING_VALUES[i % len(MISSING_VALUES)]
+            if stride == 1:
+                lines = grades
+            else:
+                # id, name and filler columns, stride - 1 tokens before the grade
+                filler = " x" * max(0, stride - 3)
+                rows_ids = range(start, start + count)
+                prefix = [f"{i} S{i}{filler}" for i in rows_ids] if stride > 2 else [str(i) for i in rows_ids]
+                lines = [f"{p} {g}" for p, g in zip(prefix, grades)]
+            f.write("\n".join(lines))
+            f.write("\n")
+    return rows
+
+
+def _measure(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, {"seconds": best, "peak_bytes": peak}
+
+
+def run_case(path, stride, repeat):
+    """Time every phase on one generated file and return ``{phase: measurement}``."""
+    first_step, increase_amount = (stride - 1, stride) if stride > 1 else (0, 1)
+    phases = {}
+
+    def read():
+        with open(path, "rb") as f:
+            return f.read()
+
+    data, phases["read"] = _measure(read, repeat)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    (starts, ends), phases["split"] = _measure(lambda: _token_bounds(buf), repeat)
+    first = _stride_start(0, first_step, increase_amount)
+    column = (starts[first::increase_amount], ends[first::increase_amount])
+    _, phases["convert"] = _measure(lambda: _convert_decimals(buf, *column), repeat)
+    notes, phases["parse"] = _measure(lambda: tokenize_notes(data, first_step, increase_amount), repeat)
+    stats, phases["stats"] = _measure(lambda: NoteStatistics.from_values(notes), repeat)
+    (values, counts), phases["unique"] = _measure(lambda: note_histogram(notes), repeat)
+    _, phases["pipeline"] = _measure(lambda: analyze_stream(BytesIO(data), first_step, increase_amount), repeat)
+
+    bars = histogram_bars("unique", values, counts)
+    y_step = max(1, int(counts.max()) // 20)
+
+    def draw():
+        fig = new_figure()
+        build_figure(bars, stats, 60.0, "Benchmark", 100, 5, y_step, fig=fig)
+        return fig
+
+    fig, phases["draw"] = _measure(draw, repeat)
+    _, phases["png"] = _measure(lambda: figure_png(fig), repeat)
+    return {"grades": len(notes), "distinct": len(values), "bytes": len(data), "phases": phases}
+
+
+def environment():
+    """Versions and machine details stored next to the results."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline):
+    """Print the time ratio of every phase of ``results`` against ``baseline``."""
+    old = {json.dumps(r["case"], sort_keys=True): r for r in baseline["results"]}
+    for result in results["results"]:
+        before = old.get(json.dumps(result["case"], sort_keys=True))
+        if before is None:
+            continue
+        ratios = []
+        for phase, measurement in result["phases"].items():
+            if phase in before["phases"] and before["phases"][phase]["seconds"] > 0:
+                ratios.append(f"{phase} {measurement['seconds'] / before['phases'][phase]['seconds']:.2f}x")
+        print(f"{_case_name(result['case'])}: {', '.join(ratios)}")
+
+
+def _case_name(case):
+    return (f"{case['tokens']:.0e} tokens, {case['precision']} decimals, "
+            f"{case['sentinel_share']:.0%} missing, stride {case['stride']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e3, 1e4, 1e5, 1e6],
+                        help="tokens per file (default 1e3 1e4 1e5 1e6, up to 1e8 for the full run)")
+    parser.add_argument("--precision", type=int, nargs="+", default=[1], help="decimals per grade")
+    parser.add_argument("--sentinel-share", type=float, nargs="+", default=[0.0, 0.05],
+                        help="share of grades replaced by missing-value markers")
+    parser.add_argument("--stride", type=int, nargs="+", default=[1, 3], help="tokens per row, the grade is last")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per phase, the best one counts")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = {"environment": environment(), "results": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "grades.txt")
+        for tokens in args.sizes:
+            for precision in args.precision:
+                for sentinel_share in args.sentinel_share:
+                    for stride in args.stride:
+                        case = {"tokens": int(tokens), "precision": precision, "sentinel_share": sentinel_share,
+                                "stride": stride}
+                        write_grades(path, tokens, precision, sentinel_share, stride)
+                        result = {"case": case, **run_case(path, stride, args.repeat)}
+                        results["results"].append(result)
+                        timings = ", ".join(f"{phase} {m['seconds'] * 1000:.1f}"
+                                            for phase, m in result["phases"].items())
+                        print(f"{_case_name(case)} [ms]: {timings}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,163 +1,139 @@
+import threading
+
 import streamlit as st
-import re
-import numpy as np
-import matplotlib.pyplot as plt
-from io import BytesIO
-
-# Title
-st.title("Note Analyzer Streamlit Application")
-
-# Image display state
-if "show_images" not in st.session_state:
-    st.session_state.show_images = True  # Default: images are shown
-
-# Sidebar input area
-st.sidebar.header("Input Fields")
-
-# File upload or text input selection
-input_method = st.sidebar.radio(
-    "How will you provide the notes?",
-    options=["Upload File", "Copy-Paste"]
-)
-
-uploaded_file = None
-text_input = None
-
-if input_method == "Upload File":
-    uploaded_file = st.sidebar.file_uploader("Upload the Notes File (TXT)", type=["txt"])
-elif input_method == "Copy-Paste":
-    text_input = st.sidebar.text_area("Paste the Notes Here", height=200)
-
-# Other parameters
-lecture_name = st.sidebar.text_input("Course Name", value="Course Name")
-perfect_score = st.sidebar.number_input("Maximum Exam Score", value=100, step=1)
-my_note = st.sidebar.number_input("My Score", value=0.0, step=0.1)
-note_s_axis_diff = st.sidebar.number_input("Score X-Axis Step Size", value=5, step=1)
-amount_s_axis_diff = st.sidebar.number_input("Frequency Y-Axis Step Size", value=1, step=1)
-first_step = st.sidebar.number_input("First Step", value=0, step=1)
-increase_amount = st.sidebar.number_input("Step Increase", value=1, step=1)
-
-if st.sidebar.button("Run Analysis"):
-    # Hide images when the button is clicked
-    st.session_state.show_images = False
-
-# Show images only if show_images is True
-if st.session_state.show_images:
-    st.subheader("How the Application Works")
-
-    # List the image filenames in order
-    image_files = ["english/a.png", "english/b.png", "english/c.png", "english/d.png"]
-
-    # Display images one below the other
-    for image_file in image_files:
-        st.image(image_file, use_container_width=True)
-
-# Load and process notes (Only works if the button is clicked)
-if not st.session_state.show_images:
-    if input_method == "Upload File" and uploaded_file is None:
-        st.error("Please upload a file!")
-    elif input_method == "Copy-Paste" and not text_input:
-        st.error("Please paste the notes into the text area!")
-    else:
-        try:
-            # Read content from file or text area
-            if uploaded_file:
-                content = uploaded_file.read().decode("utf-8")
-            elif text_input:
-                content = text_input
-
-            # Process the data
-            result = re.split(r'[ \n]+', content)
-
-            # Clean and filter the data
-            notes_result = [x.strip() for x in result[first_step::increase_amount] if x.strip() != '∅' and x.strip() != "NA"]
-            notes_result = list(map(lambda x: float(x), notes_result))
-            notes_result = np.array(notes_result)
-
-            # Statistics
-            average_x = np.average(notes_result)
-            min_x = notes_result.min()
-            max_x = notes_result.max()
-            std = np.std(notes_result)
-            z_score = (my_note - average_x) / std
-
-            # Display statistics
-            st.subheader("General Information")
-            st.write(f"Number of Participants: {len(notes_result)}")
-            st.write(f"Lowest Score: {min_x:.2f}")
-            st.write(f"Highest Score: {max_x:.2f}")
-            st.write(f"Average Score: {average_x:.2f}")
-            st.write(f"Standard Deviation: {std:.2f}")
-            st.write(f"Z-Score: {z_score:.2f}")
-
-            # Create plot
-            st.subheader("Score Distribution Graph")
-            unique_values, counts = np.unique(notes_result, return_counts=True)
-            plt.figure(figsize=(10, 6))
-            bars = plt.bar(unique_values, counts, width=0.3)
-            plt.axvline(x=average_x, color='red', linestyle='--')
-            plt.text(average_x + 1.5, max(counts), 'Average Score', color='red', rotation=0, ha='center', va='bottom')
-
-            if my_note in unique_values:
-                plt.text(my_note, counts[unique_values == my_note][0], 'My\nScore', color='green', rotation=0, ha='center', va='bottom')
-
-            for bar in bars:
-                if bar.get_x() <= my_note < bar.get_x() + bar.get_width():
-                    bar.set_color('green')
-
-            plt.title(f'{lecture_name} Score Distribution')
-            plt.xlabel('Scores')
-            plt.ylabel('Count')
-            plt.xticks(range(0, int(perfect_score), note_s_axis_diff), rotation=90)
-            plt.yticks(range(0, max(counts), amount_s_axis_diff), rotation=0)
-
-            # Add graph information
-            info_text = (
-                f"Number of participants: {len(notes_result)}\n"
-                f"Lowest score: {min_x:.2f}\n"
-                f"Highest score: {max_x:.2f}\n"
-                f"My score: {my_note:.2f}\n"
-                f"Average score: {average_x:.2f}\n"
-                f"Standard deviation: {std:.2f}\n"
-                f"Z-score: {z_score:.2f}"
-            )
-            plt.text(
-                1.05 * max(unique_values), 0.8 * max(counts),
-                info_text,
-                fontsize=10,
-                color="black",
-                ha="left",
-                va="top",
-                bbox=dict(boxstyle="round,pad=0.3", edgecolor="blue", facecolor="lightgrey")
-            )
-            plt.subplots_adjust(left=0.055, bottom=0.065, right=0.90, top=0.962, wspace=0.2, hspace=0.2)
-
-            # Display the plot
-            st.pyplot(plt)
-
-            # Download button for the plot
-            buf = BytesIO()
-            plt.savefig(buf, format="png")
-            buf.seek(0)
-            st.download_button(
-                label="Download Graph",
-                data=buf,
-                file_name="score_distribution.png",
-                mime="image/png"
-            )
-
-        except Exception as e:
-            st.error(f"Error: {e}")
-
-# Footer
-st.markdown("---")
-st.write("Developed by: Ali Cemil Özdemir")
-st.write("Date: 01.12.2024")
-st.write("For feedback and suggestions, you can contact me at alicemilozdemir7@gmail.com")
-
-# Add a note at the bottom right corner of the page
-st.markdown("""
-    <p style="position:absolute; bottom:0px; right:0px; font-size: 12px; color: gray;">
-        Created with Note Analyzer
-    </p>
-    """, unsafe_allow_html=True)
+
+from analysis_view import ANALYSIS_TEXTS, show_analysis, show_comparison
+from note_analyzer import CHART_MODES, EXPORT_FORMATS, HISTOGRAM_MODES, tutorial_images, warm_up
+
+# Once per server: prepare the chart library and its font cache in the background
+# so the first analysis does not wait for it
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    thread = threading.Thread(target=warm_up, daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    # Title
+    st.title("Note Analyzer Streamlit Application")
+
+    # Image display state
+    if "show_images" not in st.session_state:
+        st.session_state.show_images = True  # Default: images are shown
+
+    # Sidebar input area
+    st.sidebar.header("Input Fields")
+
+    # File upload or text input selection
+    input_method = st.sidebar.radio(
+        "How will you provide the notes?",
+        options=["Upload File", "Copy-Paste", "Compare Courses"]
+    )
+
+    uploaded_file = None
+    text_input = None
+    compare_files = []
+
+    if input_method == "Upload File":
+        uploaded_file = st.sidebar.file_uploader("Upload the Notes File (TXT)", type=["txt"])
+    elif input_method == "Copy-Paste":
+        text_input = st.sidebar.text_area("Paste the Notes Here", height=200)
+    elif input_method == "Compare Courses":
+        # Several files for the comparison
+        compare_files = st.sidebar.file_uploader("Upload the Notes Files to Compare (TXT)", type=["txt"], accept_multiple_files=True)
+
+    # Other parameters
+    lecture_name = st.sidebar.text_input("Course Name", value="Course Name")
+    perfect_score = st.sidebar.number_input("Maximum Exam Score", value=100, step=1)
+    my_note = st.sidebar.number_input("My Score", value=0.0, step=0.1)
+    note_s_axis_diff = st.sidebar.number_input("Score X-Axis Step Size", value=5, step=1)
+    amount_s_axis_diff = st.sidebar.number_input("Frequency Y-Axis Step Size", value=1, step=1)
+    first_step = st.sidebar.number_input("First Step", value=0, min_value=0, step=1)
+    increase_amount = st.sidebar.number_input("Step Increase", value=1, min_value=1, step=1)
+    histogram_mode = st.sidebar.selectbox(
+        "Chart Bars",
+        options=HISTOGRAM_MODES,
+        format_func={"unique": "One bar per score", "fixed": "Fixed-width bins",
+                     "fd": "Freedman–Diaconis bins", "perfect": "Bins aligned to the maximum score"}.get
+    )
+    bin_width = st.sidebar.number_input("Bin Width", value=1.0, min_value=0.01, step=0.5)
+    # Whether the chart is drawn on the server or in the browser
+    chart_mode = st.sidebar.selectbox(
+        "Chart Rendering",
+        options=CHART_MODES,
+        format_func={"image": "Image (drawn on the server)", "browser": "Interactive (drawn in the browser)"}.get
+    )
+    # Format and resolution of the downloaded graph
+    export_format = st.sidebar.selectbox(
+        "Graph Download Format",
+        options=EXPORT_FORMATS,
+        format_func=lambda option: f"PNG ({option[1]} dpi)" if option[1] else option[0].upper()
+    )
+    # Add the scores to the previous analyses
+    append_mode = st.sidebar.checkbox("Append Mode (add new scores to the previous ones)")
+    # Measure the time and input size of every stage; memory is only traced when the operator turns it on
+    show_diagnostics = st.sidebar.checkbox("Diagnostics (time and input size of every stage)")
+
+    run_clicked = st.sidebar.button("Run Analysis")
+    if run_clicked:
+        # Hide images when the button is clicked
+        st.session_state.show_images = False
+
+    # Clear the scores collected in append mode
+    if append_mode and st.sidebar.button("Reset Appended Scores"):
+        st.session_state.pop("running_analysis", None)
+        st.session_state.show_images = True
+
+    # Show images only if show_images is True
+    if st.session_state.show_images:
+        st.subheader("How the Application Works")
+
+        # List the image filenames in order
+        image_files = ["english/a.png", "english/b.png", "english/c.png", "english/d.png"]
+
+        # Display images one below the other
+        # Images are read and compressed once per process, then served from memory
+        for image in tutorial_images(image_files):
+            st.image(image, use_container_width=True)
+
+    # Load and process notes (Only works if the button is clicked)
+    if not st.session_state.show_images:
+        if input_method == "Upload File" and uploaded_file is None:
+            st.error("Please upload a file!")
+        elif input_method == "Copy-Paste" and not text_input:
+            st.error("Please paste the notes into the text area!")
+        elif input_method == "Compare Courses" and len(compare_files) < 2:
+            st.error("Please upload at least two files to compare!")
+        elif input_method == "Compare Courses":
+            # The comparison of several courses is shared by every language
+            show_comparison(ANALYSIS_TEXTS["english"], compare_files=compare_files, perfect_score=perfect_score,
+                            my_note=my_note, note_s_axis_diff=note_s_axis_diff,
+                            amount_s_axis_diff=amount_s_axis_diff, first_step=first_step,
+                            increase_amount=increase_amount, histogram_mode=histogram_mode, bin_width=bin_width)
+        else:
+            # The analysis of one grade set is shared by every language
+            show_analysis(ANALYSIS_TEXTS["english"], uploaded_file=uploaded_file, text_input=text_input,
+                          lecture_name=lecture_name, perfect_score=perfect_score, my_note=my_note,
+                          note_s_axis_diff=note_s_axis_diff, amount_s_axis_diff=amount_s_axis_diff,
+                          first_step=first_step, increase_amount=increase_amount, histogram_mode=histogram_mode,
+                          bin_width=bin_width, chart_mode=chart_mode, export_format=export_format,
+                          append_mode=append_mode, show_diagnostics=show_diagnostics, run_clicked=run_clicked)
+
+    # Footer
+    st.markdown("---")
+    st.write("Developed by: Ali Cemil Özdemir")
+    st.write("Date: 01.12.2024")
+    st.write("For feedback and suggestions, you can contact me at alicemilozdemir7@gmail.com")
+
+    # Add a note at the bottom right corner of the page
+    st.markdown("""
+        <p style="position:absolute; bottom:0px; right:0px; font-size: 12px; color: gray;">
+            Created with Note Analyzer
+        </p>
+        """, unsafe_allow_html=True)
+
+# The page is only drawn under streamlit run. Worker processes re-run this file as __mp_main__
+# and must neither draw it nor start a warm-up. The warm-up starts after the page is drawn
+if __name__ == "__main__":
+    main()
+    start_warm_up()
@@ -0,0 +1,100 @@
+"""Headless analysis engine behind the Note Analyzer app.
+
+Everything here is importable without Streamlit, so the app, the
+standalone scripts and batch jobs all share one parse -> statistics ->
+histogram -> figure code path.
+
+Names are loaded on first access: ``import note_analyzer`` itself pulls in
+neither NumPy nor matplotlib, so the language selection screen stays fast.
+"""
+
+from importlib import import_module
+
+# Public names and the submodule each one lives in
+_EXPORTS = {
+    ".options": ("CHART_MODES", "EXPORT_FORMATS", "EXPORT_MIME_TYPES", "HISTOGRAM_MODES"),
+    ".parsing": (
+        "CHUNK_SIZE",
+        "GradeColumn",
+        "MISSING_VALUES",
+        "MalformedToken",
+        "ParseReport",
+        "iter_note_chunks",
+        "parse_notes",
+        "read_grade_column",
+        "read_notes",
+        "tokenize_notes",
+    ),
+    ".stats": ("NoteStatistics", "compute_statistics", "ragged_statistics"),
+    ".histogram": (
+        "Histogram",
+        "binned_histogram",
+        "chunk_histogram",
+        "freedman_diaconis_width",
+        "histogram_bars",
+        "merge_histograms",
+        "note_histogram",
+        "ragged_histogram",
+    ),
+    ".charts": (
+        "CHART_DPI",
+        "CHART_LABELS",
+        "EXPORT_CACHE_BYTES",
+        "FigurePool",
+        "bar_collection",
+        "build_base_figure",
+        "build_chart_spec",
+        "build_comparison_figure",
+        "build_figure",
+        "draw_highlight",
+        "export_cache",
+        "export_chart",
+        "figure_bytes",
+        "figure_png",
+        "figure_pool",
+        "get_render_pool",
+        "highlighted_bars",
+        "new_figure",
+        "render_chart_png",
+        "render_comparison_png",
+        "submit_chart",
+        "submit_comparison",
+    ),
+    ".compare": ("CourseComparison", "compare_courses", "comparison_bin_width"),
+    ".cohort": (
+        "COHORT_HEADERS",
+        "CohortTable",
+        "LETTER_BANDS",
+        "cohort_csv",
+        "cohort_table",
+        "letter_bands",
+        "percentile_ranks",
+        "table_csv",
+    ),
+    ".pipeline": ("analyze_array", "analyze_stream", "summarize_chunks"),
+    ".parallel": ("PARALLEL_MIN_BYTES", "get_process_pool", "parallel_analyze", "shard_bounds"),
+    ".cache": ("AnalysisCache", "analysis_cache", "analyze_cached", "content_hash"),
+    ".running": ("RunningAnalysis",),
+    ".diagnostics": ("TRACE_MEMORY", "Diagnostics", "PhaseRecord", "phase"),
+    ".store": ("NotesStore",),
+    ".images": ("load_image", "tutorial_images"),
+    ".batch": ("run_batch",),
+    ".warmup": ("warm_up",),
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,196 @@
+"""Analyze many grade files at once from the command line.
+
+    python -m note_analyzer.batch exports/ "archive/*.txt" -o charts --first-step 2
+
+Every file goes through the same parse -> statistics -> histogram -> chart
+steps as the app, in a pool of worker processes. One PNG chart per file and
+a summary (``summary.json``, or CSV when the path ends in ``.csv``) are
+written to the output directory.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .charts import CHART_LABELS, figure_pool, render_chart_png
+from .histogram import chunk_histogram, histogram_bars
+from .options import HISTOGRAM_MODES
+from .parsing import ParseReport
+from .pipeline import analyze_array, analyze_stream
+from .store import NotesStore
+
+# Without --y-step the y axis gets about this many ticks
+Y_TICKS = 20
+
+SUMMARY_FIELDS = ["file", "chart", "count", "min", "max", "mean", "std", "malformed", "bytes", "seconds",
+                  "error"]
+
+
+def find_inputs(patterns):
+    """Expand directories (their ``*.txt`` files) and glob patterns to file paths."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "*.txt"))
+        else:
+            matches = glob.glob(pattern)
+        paths.extend(sorted(path for path in matches if os.path.isfile(path)))
+    # A file matched by two patterns is analyzed once
+    return list(dict.fromkeys(paths))
+
+
+def chart_names(paths):
+    """Give every input a distinct ``<name>.png`` chart file name."""
+    names = []
+    used = set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = f"{stem}.png"
+        suffix = 2
+        while name in used:
+            name = f"{stem}-{suffix}.png"
+            suffix += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def analyze_file(path, chart_path, options):
+    """Analyze one file, write its chart and return its summary row.
+
+    Errors are reported in the ``error`` field instead of being raised, so
+    one broken export does not stop the whole batch.
+    """
+    start = time.perf_counter()
+    row = dict.fromkeys(SUMMARY_FIELDS)
+    row.update(file=path, bytes=os.path.getsize(path))
+    try:
+        report = ParseReport()
+        histogram = chunk_histogram(options["histogram_mode"], options["bin_width"], options["perfect_score"])
+        with open(path, "rb") as f:
+            if options["store"]:
+                # Parsed grades are kept as .npy files, a second run maps them instead of parsing
+                notes = NotesStore(options["store"]).notes(f.read(), options["first_step"],
+                                                           options["increase_amount"], report)
+                stats, values, counts = analyze_array(notes, histogram)
+            else:
+                stats, values, counts = analyze_stream(f, options["first_step"], options["increase_amount"],
+                                                       report=report, histogram=histogram)
+        bars = histogram_bars(options["histogram_mode"], values, counts, options["bin_width"],
+                              options["perfect_score"])
+        lecture_name = os.path.splitext(os.path.basename(path))[0]
+        amount_s_axis_diff = options["amount_s_axis_diff"] or max(1, int(bars.counts.max()) // Y_TICKS)
+        png = render_chart_png(bars, stats, options["my_note"], lecture_name, options["perfect_score"],
+                               options["note_s_axis_diff"], amount_s_axis_diff, options["language"],
+                               pool=figure_pool)
+        with open(chart_path, "wb") as f:
+            f.write(png)
+        row.update(chart=chart_path, count=stats.count, min=stats.min, max=stats.max, mean=stats.mean,
+                   std=stats.std, malformed=report.malformed_count)
+    except (OSError, ValueError) as e:
+        row["error"] = str(e)
+    row["seconds"] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def write_summary(rows, path):
+    """Write the summary rows as CSV when ``path`` ends in ``.csv``, as JSON otherwise."""
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+def run_batch(paths, output_dir, options, workers=None, progress=None):
+    """Analyze ``paths`` in a process pool and return the summary rows in input order.
+
+    ``progress`` is called with ``(done, total, row)`` after every file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    chart_paths = [os.path.join(output_dir, name) for name in chart_names(paths)]
+    rows = [None] * len(paths)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(analyze_file, path, chart_path, options): i
+                   for i, (path, chart_path) in enumerate(zip(paths, chart_paths))}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            rows[i] = future.result()
+            if progress is not None:
+                progress(done, len(paths), rows[i])
+    return rows
+
+
+def _print_progress(done, total, row):
+    if row["error"]:
+        status = f"error: {row['error']}"
+    else:
+        status = f"{row['count']} grades, mean {row['mean']:.2f}"
+    print(f"[{done}/{total}] {row['file']}: {status} ({row['seconds']:.2f} s)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m note_analyzer.batch",
+                                     description="Analyze a directory or glob of grade files.")
+    parser.add_argument("inputs", nargs="+", help="directories (their *.txt files) or glob patterns")
+    parser.add_argument("-o", "--output", default="note_analyzer_output", help="directory for the charts")
+    parser.add_argument("--summary", help="summary file, .json or .csv (default: OUTPUT/summary.json)")
+    parser.add_argument("--first-step", type=int, default=0, help="index where the grades start")
+    parser.add_argument("--increase-amount", type=int, default=1, help="number of columns per row")
+    parser.add_argument("--perfect-score", type=float, default=100, help="highest possible grade")
+    parser.add_argument("--my-note", type=float, default=0.0, help="grade to highlight on the charts")
+    parser.add_argument("--x-step", type=int, default=5, help="distance between the x axis ticks")
+    parser.add_argument("--y-step", type=int, help=f"distance between the y axis ticks (default: about {Y_TICKS} ticks)")
+    parser.add_argument("--histogram-mode", choices=HISTOGRAM_MODES, default="unique")
+    parser.add_argument("--bin-width", type=float, default=1.0, help="bar width of the fixed mode")
+    parser.add_argument("--language", choices=sorted(CHART_LABELS), default="english")
+    parser.add_argument("--store", help="directory that keeps the parsed grades for later runs")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    paths = find_inputs(args.inputs)
+    if not paths:
+        parser.error("no input files found")
+
+    options = {
+        "first_step": args.first_step,
+        "increase_amount": args.increase_amount,
+        "perfect_score": args.perfect_score,
+        "my_note": args.my_note,
+        "note_s_axis_diff": args.x_step,
+        "amount_s_axis_diff": args.y_step,
+        "histogram_mode": args.histogram_mode,
+        "bin_width": args.bin_width,
+        "language": args.language,
+        "store": args.store,
+    }
+
+    start = time.perf_counter()
+    rows = run_batch(paths, args.output, options, args.workers, progress=_print_progress)
+    elapsed = time.perf_counter() - start
+
+    summary = args.summary or os.path.join(args.output, "summary.json")
+    write_summary(rows, summary)
+
+    failed = sum(1 for row in rows if row["error"])
+    grades = sum(row["count"] or 0 for row in rows)
+    megabytes = sum(row["bytes"] for row in rows) / (1 << 20)
+    print(f"{len(rows) - failed}/{len(rows)} files in {elapsed:.2f} s: "
+          f"{len(rows) / elapsed:.1f} files/s, {megabytes / elapsed:.1f} MB/s, {grades / elapsed:,.0f} grades/s",
+          file=sys.stderr)
+    print(f"summary written to {summary}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+from .diagnostics import phase
+from .histogram import note_histogram
+from .parallel import parallel_analyze
+from .parsing import ParseReport
+
+# Memory the shared cache may use for results before it evicts old ones
+DEFAULT_CACHE_BYTES = 256 << 20
+
+
+def content_hash(data):
+    """Return a hex digest identifying the content of a bytes object."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _histogram_key(histogram):
+    # functools.partial objects compare by identity, key them by what they do
+    func = getattr(histogram, "func", histogram)
+    keywords = getattr(histogram, "keywords", {})
+    return f"{func.__module__}.{func.__qualname__}", tuple(sorted(keywords.items()))
+
+
+def _result_nbytes(result):
+    # Approximate size of a cached (stats, values, counts, report) entry
+    stats, values, counts, report = result
+    return (values.nbytes + counts.nbytes + sys.getsizeof(stats)
+            + sum(sys.getsizeof(token.text) + 64 for token in report.malformed) + 256)
+
+
+class AnalysisCache:
+    """Thread-safe LRU cache of analysis results with a memory budget.
+
+    Entries are evicted least recently used first once the approximate size
+    of the cached results goes over ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._digests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+
+    def digest(self, data, source_id=None):
+        """Return ``content_hash(data)``, remembered per ``source_id``.
+
+        ``source_id`` names content that never changes, such as the id of an
+        uploaded file, so reruns over the same upload skip hashing it again.
+        """
+        if source_id is None:
+            return content_hash(data)
+        with self._lock:
+            digest = self._digests.get(source_id)
+            if digest is not None:
+                self._digests.move_to_end(source_id)
+                return digest
+        digest = content_hash(data)
+        with self._lock:
+            self._digests[source_id] = digest
+            if len(self._digests) > 1024:
+                self._digests.popitem(last=False)
+        return digest
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self.current_bytes = 0
+
+
+# Shared by every session of the process
+analysis_cache = AnalysisCache()
+
+
+def analyze_cached(data, first_step=0, increase_amount=1, report=None, histogram=note_histogram,
+                   source_id=None, cache=None, diagnostics=None):
+    """Return ``(stats, values, counts)`` of ``data``, parsing it only once.
+
+    Results are keyed by a hash of the content plus the parse parameters,
+    so reruns that only change the chart texts or ``my_note`` are served
+    from ``cache`` (the shared ``analysis_cache`` by default). Large inputs
+    are parsed with ``parallel_analyze``.
+
+    With ``diagnostics`` the cache lookup is measured, and on a miss every
+    stage of the parse.
+    """
+    cache = analysis_cache if cache is None else cache
+    with phase(diagnostics, "cache", len(data)) as detail:
+        key = (cache.digest(data, source_id), first_step, increase_amount, _histogram_key(histogram))
+        result = cache.get(key)
+        detail["hit"] = result is not None
+
+    if result is None:
+        parse_report = ParseReport()
+        stats, values, counts = parallel_analyze(data, first_step, increase_amount, report=parse_report,
+                                                 histogram=histogram, diagnostics=diagnostics)
+        result = (stats, values, counts, parse_report)
+        cache.put(key, result, _result_nbytes(result))
+
+    stats, values, counts, parse_report = result
+    if report is not None:
+        report.merge(parse_report)
+    # The accumulator is mutable, hand out a copy so the cached one stays intact
+    return stats.copy(), values, counts
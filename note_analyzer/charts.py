@@ -0,0 +1,620 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from io import BytesIO
+from queue import Empty, Full, LifoQueue
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+from .cache import AnalysisCache, content_hash
+from .diagnostics import Diagnostics, phase
+
+# Texts drawn on the chart for every language of the app
+CHART_LABELS = {
+    "turkish": {
+        "average": "Ortalama Not",
+        "my_note": "Benim\nNotum",
+        "title": "{lecture_name} Not Sayıları Grafiği",
+        "xlabel": "Notlar",
+        "ylabel": "Adet",
+        "comparison_title": "Ders Karşılaştırması",
+        "course_legend": "{name} (n={count}, ort. {mean:.2f})",
+        "info": (
+            "Katilimci sayısı: {count}\n"
+            "En düşük not: {min:.2f}\n"
+            "En yüksek not: {max:.2f}\n"
+            "Benim notum: {my_note:.2f}\n"
+            "Ortalama not: {average:.2f}\n"
+            "Standart sapma: {std:.2f}\n"
+            "Z-skoru: {z_score:.2f}"
+        ),
+    },
+    "english": {
+        "average": "Average Score",
+        "my_note": "My\nScore",
+        "title": "{lecture_name} Score Distribution",
+        "xlabel": "Scores",
+        "ylabel": "Count",
+        "comparison_title": "Course Comparison",
+        "course_legend": "{name} (n={count}, mean {mean:.2f})",
+        "info": (
+            "Number of participants: {count}\n"
+            "Lowest score: {min:.2f}\n"
+            "Highest score: {max:.2f}\n"
+            "My score: {my_note:.2f}\n"
+            "Average score: {average:.2f}\n"
+            "Standard deviation: {std:.2f}\n"
+            "Z-score: {z_score:.2f}"
+        ),
+    },
+    "arabic": {
+        "average": "متوسط الدرجات",
+        "my_note": "درجتي",
+        "title": "رسم توزيع الدرجات لمادة {lecture_name}",
+        "xlabel": "الدرجات",
+        "ylabel": "التكرار",
+        "comparison_title": "مقارنة المواد",
+        "course_legend": "{name} (n={count}، المتوسط {mean:.2f})",
+        "info": (
+            "عدد المشاركين: {count}\n"
+            "أقل درجة: {min:.2f}\n"
+            "أعلى درجة: {max:.2f}\n"
+            "درجتي: {my_note:.2f}\n"
+            "متوسط الدرجات: {average:.2f}\n"
+            "الانحراف المعياري: {std:.2f}\n"
+            "درجة Z: {z_score:.2f}"
+        ),
+    },
+}
+
+FOOTER_TEXT = "Generated by Note Analyzer at HuggingFace aliicemill/NoteAnalyzer space"
+
+# Resolution of the chart PNG shown on the page and offered for download
+CHART_DPI = 150
+
+FIGURE_SIZE = (10, 6)
+
+# Colour of the bars that matplotlib draws by default, used in the browser
+# chart too so both look alike
+BAR_COLOR = "#1f77b4"
+MY_NOTE_COLOR = "green"
+
+# Up to this many bars every bar is drawn as its own rectangle. More bars
+# than that are narrower than a pixel, and their outline is drawn instead,
+# sampled on _OUTLINE_COLUMNS columns.
+MAX_EXACT_BARS = 2048
+_OUTLINE_COLUMNS = 4096
+
+# Memory the exported charts may use before old ones are evicted
+EXPORT_CACHE_BYTES = 64 << 20
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def new_figure():
+    """Return an empty chart ``Figure`` with its own Agg canvas.
+
+    The canvas is attached directly instead of going through pyplot, so no
+    backend switch or global figure manager is involved.
+    """
+    fig = Figure(figsize=FIGURE_SIZE)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+class FigurePool:
+    """A small stack of cleared ``Figure`` objects that charts are drawn into.
+
+    Figures are created without pyplot, so nothing registers them globally;
+    ``release`` clears a figure and keeps up to ``size`` of them for reuse.
+    """
+
+    def __init__(self, size=4):
+        self._figures = LifoQueue(maxsize=size)
+
+    def acquire(self):
+        try:
+            return self._figures.get_nowait()
+        except Empty:
+            return new_figure()
+
+    def release(self, fig):
+        fig.clear()
+        try:
+            self._figures.put_nowait(fig)
+        except Full:
+            pass
+
+
+# Shared by every session of the process
+figure_pool = FigurePool()
+
+
+def _bar_starts(histogram):
+    # Left edge of every bar, whichever way the bars are aligned
+    starts = np.asarray(histogram.positions, dtype=np.float64)
+    if histogram.align == "center":
+        starts = starts - histogram.width / 2
+    return starts
+
+
+def _bars_outline(starts, width, counts):
+    # Height of the tallest bar over each column, as one stepped polygon
+    # that drops to zero where no bar is
+    low, high = starts.min(), starts.max() + width
+    step = (high - low) / _OUTLINE_COLUMNS
+    first = np.clip(np.floor((starts - low) / step).astype(np.int64), 0, _OUTLINE_COLUMNS - 1)
+    last = np.clip(np.ceil((starts + width - low) / step).astype(np.int64), first + 1, _OUTLINE_COLUMNS)
+    spans = last - first
+    columns = np.repeat(first - (np.cumsum(spans) - spans), spans) + np.arange(spans.sum())
+    heights = np.zeros(_OUTLINE_COLUMNS)
+    np.maximum.at(heights, columns, np.repeat(counts, spans))
+
+    x = np.repeat(low + step * np.arange(_OUTLINE_COLUMNS + 1), 2)
+    y = np.concatenate(([0.0], np.repeat(heights, 2), [0.0]))
+    return np.column_stack((x, y))
+
+
+def bar_collection(starts, width, counts, color=BAR_COLOR):
+    """Return bars of the given left edges, width and heights as one ``PolyCollection``.
+
+    All rectangles are drawn in a single call instead of one ``Rectangle``
+    artist each. Past ``MAX_EXACT_BARS`` only their outline is drawn, so a
+    chart of 100,000 bars takes about as long as one of a hundred.
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    if len(starts) <= MAX_EXACT_BARS:
+        polygons = np.zeros((len(starts), 4, 2))
+        polygons[:, :2, 0] = starts[:, None]
+        polygons[:, 2:, 0] = (starts + width)[:, None]
+        polygons[:, 1:3, 1] = counts[:, None]
+    else:
+        polygons = [_bars_outline(starts, width, counts)]
+    bars = PolyCollection(polygons, closed=True, facecolors=color, edgecolors="none", linewidths=0)
+    # Like ax.bar, the y axis starts at zero without a margin below
+    bars.sticky_edges.y.append(0)
+    return bars
+
+
+def highlighted_bars(histogram, my_note):
+    """Return the indices of the bars of a ``Histogram`` that ``my_note`` falls in.
+
+    The bars are sorted by position, so the few candidates are found by
+    binary search instead of testing every bar.
+    """
+    starts = _bar_starts(histogram)
+    # Bars starting after my_note cannot hold it, nor can those starting a
+    # whole width or more before it; one more on the left absorbs rounding
+    low = max(int(np.searchsorted(starts, my_note - histogram.width)) - 1, 0)
+    high = int(np.searchsorted(starts, my_note, side="right"))
+    candidates = np.arange(low, high)
+    return candidates[my_note < starts[low:high] + histogram.width]
+
+
+def build_base_figure(histogram, stats, lecture_name, perfect_score,
+                      note_s_axis_diff, amount_s_axis_diff, language="english", fig=None):
+    """Draw everything of the chart that does not depend on ``my_note``.
+
+    ``draw_highlight`` adds the rest; ``build_figure`` does both.
+    """
+    labels = CHART_LABELS[language]
+    average_x = stats.mean
+    counts = histogram.counts
+    max_count = int(np.max(counts))
+
+    if fig is None:
+        fig = new_figure()
+    ax = fig.add_subplot()
+    ax.add_collection(bar_collection(_bar_starts(histogram), histogram.width, counts))
+    ax.axvline(x=average_x, color='red', linestyle='--')
+    ax.text(average_x + 1.5, max_count, labels["average"], color='red', rotation=0, ha='center', va='bottom')
+
+    ax.set_title(labels["title"].format(lecture_name=lecture_name))
+    ax.set_xlabel(labels["xlabel"])
+    ax.set_ylabel(labels["ylabel"])
+    ax.set_xticks(range(0, int(perfect_score), note_s_axis_diff))
+    ax.set_yticks(range(0, max_count, amount_s_axis_diff))
+    ax.tick_params(axis="x", labelrotation=90)
+    fig.subplots_adjust(left=0.055, bottom=0.065, right=0.90, top=0.962, wspace=0.2, hspace=0.2)
+    _draw_footer(ax)
+    return fig
+
+
+def draw_highlight(fig, histogram, stats, my_note, language="english"):
+    """Draw the ``my_note`` layer on a base figure: the green bar, its label and the summary box.
+
+    Returns a function that takes the layer off again, so the same figure
+    can be highlighted for another score without drawing the bars again.
+    """
+    labels = CHART_LABELS[language]
+    ax = fig.axes[0]
+    counts = histogram.counts
+    added = []
+
+    mine = highlighted_bars(histogram, my_note)
+    if len(mine):
+        # The highlighted bars are drawn again in green on top of the others.
+        # Bars closer than their width overlap, then only the tallest of
+        # them is labelled.
+        starts = _bar_starts(histogram)
+        added.append(ax.add_collection(bar_collection(starts[mine], histogram.width, counts[mine], MY_NOTE_COLOR),
+                                       autolim=False))
+        index = mine[np.argmax(counts[mine])]
+        added.append(ax.text(starts[index] + histogram.width / 2, counts[index], labels["my_note"],
+                             color=MY_NOTE_COLOR, rotation=0, ha='center', va='bottom'))
+
+    # Summary box next to the bars
+    info_text = labels["info"].format(count=stats.count, min=stats.min, max=stats.max, my_note=my_note,
+                                      average=stats.mean, std=stats.std, z_score=stats.z_score(my_note))
+    added.append(ax.text(
+        1.05 * np.max(histogram.positions), 0.8 * np.max(counts),
+        info_text,
+        fontsize=10,
+        color="black",
+        ha="left",
+        va="top",
+        bbox=dict(boxstyle="round,pad=0.3", edgecolor="blue", facecolor="lightgrey")
+    ))
+
+    def remove():
+        for artist in added:
+            artist.remove()
+
+    return remove
+
+
+def build_figure(histogram, stats, my_note, lecture_name, perfect_score,
+                 note_s_axis_diff, amount_s_axis_diff, language="english", fig=None):
+    """Draw the bars of a ``Histogram`` and return the figure.
+
+    The chart is drawn into ``fig`` when given, otherwise into a new
+    ``Figure``. Either way the caller owns the figure and should ``clear``
+    it (or hand it back to its ``FigurePool``) once it has been rendered.
+    """
+    fig = build_base_figure(histogram, stats, lecture_name, perfect_score,
+                            note_s_axis_diff, amount_s_axis_diff, language, fig)
+    draw_highlight(fig, histogram, stats, my_note, language)
+    return fig
+
+
+# Finished charts of every session, keyed by what they show and their format
+export_cache = AnalysisCache(EXPORT_CACHE_BYTES)
+
+
+def _bars_digest(histogram):
+    return content_hash(np.ascontiguousarray(histogram.positions, dtype=np.float64).tobytes()
+                        + np.ascontiguousarray(histogram.counts, dtype=np.int64).tobytes())
+
+
+def _comparison_digest(comparison):
+    # Everything build_comparison_figure draws of a CourseComparison
+    stats = [(s.count, s.mean, s.m2, s.min, s.max) for s in comparison.stats]
+    return content_hash("\0".join(comparison.names).encode("utf-8")
+                        + np.array(stats, dtype=np.float64).tobytes()
+                        + np.ascontiguousarray(comparison.edges, dtype=np.float64).tobytes()
+                        + np.ascontiguousarray(comparison.counts, dtype=np.int64).tobytes())
+
+
+def build_chart_spec(histogram, stats, my_note, lecture_name, perfect_score,
+                     note_s_axis_diff, amount_s_axis_diff, language="english"):
+    """Return a Vega-Lite spec of the chart that ``build_figure`` draws.
+
+    Only the bars, the average line and the ``my_note`` marker are sent, the
+    browser lays out and draws the chart itself. The summary box is left
+    out, the app prints the same numbers above the chart.
+    """
+    labels = CHART_LABELS[language]
+    counts = histogram.counts.tolist()
+    positions = histogram.positions.tolist()
+    width = histogram.width
+    centered = histogram.align == "center"
+    max_count = max(counts)
+    bars = []
+    for position, count in zip(positions, counts):
+        start = position - width / 2 if centered else position
+        bars.append({"start": start, "end": start + width, "count": count, "mine": False,
+                     "label": f"{position:g}" if centered else f"{start:g}–{start + width:g}"})
+    mine = [bars[index] for index in highlighted_bars(histogram, my_note).tolist()]
+    for bar in mine:
+        bar["mine"] = True
+
+    layers = [
+        {
+            "data": {"values": bars},
+            "mark": {"type": "rect"},
+            "encoding": {
+                "x": {"field": "start", "type": "quantitative", "title": labels["xlabel"],
+                      "axis": {"values": list(range(0, int(perfect_score), note_s_axis_diff)), "labelAngle": -90}},
+                "x2": {"field": "end"},
+                "y": {"field": "count", "type": "quantitative", "title": labels["ylabel"],
+                      "axis": {"values": list(range(0, max_count, amount_s_axis_diff))}},
+                "y2": {"datum": 0},
+                "color": {"condition": {"test": "datum.mine", "value": MY_NOTE_COLOR}, "value": BAR_COLOR},
+                "tooltip": [{"field": "label", "title": labels["xlabel"]},
+                            {"field": "count", "title": labels["ylabel"]}],
+            },
+        },
+        # Marker layers carry one row of their own, with the bars as data
+        # they would be drawn once per bar
+        {
+            "data": {"values": [{}]},
+            "mark": {"type": "rule", "color": "red", "strokeDash": [6, 4]},
+            "encoding": {"x": {"datum": stats.mean}},
+        },
+        {
+            "data": {"values": [{}]},
+            "mark": {"type": "text", "color": "red", "baseline": "bottom"},
+            "encoding": {"x": {"datum": stats.mean + 1.5}, "y": {"datum": max_count},
+                         "text": {"value": labels["average"]}},
+        },
+    ]
+    for bar in sorted(mine, key=lambda bar: bar["count"])[-1:]:
+        layers.append({
+            "data": {"values": [{}]},
+            "mark": {"type": "text", "color": MY_NOTE_COLOR, "baseline": "bottom"},
+            "encoding": {"x": {"datum": (bar["start"] + bar["end"]) / 2}, "y": {"datum": bar["count"]},
+                         "text": {"value": labels["my_note"].split("\n")}},
+        })
+
+    return {
+        "title": labels["title"].format(lecture_name=lecture_name),
+        "height": 400,
+        "layer": layers,
+    }
+
+
+def build_comparison_figure(comparison, perfect_score, note_s_axis_diff, amount_s_axis_diff,
+                            language="english", fig=None):
+    """Overlay the distributions of a ``CourseComparison`` on shared axes.
+
+    Every course is drawn as a step outline over the shared bins with a
+    dashed line at its average, in the same colour.
+    """
+    labels = CHART_LABELS[language]
+    if fig is None:
+        fig = new_figure()
+    ax = fig.add_subplot()
+    if len(comparison.names) > 10:
+        # The default colour cycle repeats after ten lines
+        ax.set_prop_cycle(color=colormaps["tab20"].colors)
+
+    for name, stats, counts in zip(comparison.names, comparison.stats, comparison.counts):
+        legend = labels["course_legend"].format(name=name, count=stats.count, mean=stats.mean)
+        line = ax.stairs(counts, comparison.edges, linewidth=1.5, label=legend)
+        ax.axvline(x=stats.mean, color=line.get_edgecolor(), linestyle='--', alpha=0.6)
+
+    max_count = int(comparison.counts.max())
+    ax.set_title(labels["comparison_title"])
+    ax.set_xlabel(labels["xlabel"])
+    ax.set_ylabel(labels["ylabel"])
+    ax.set_xticks(range(0, int(perfect_score), note_s_axis_diff))
+    ax.set_yticks(range(0, max_count, amount_s_axis_diff))
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.legend(loc="upper left", bbox_to_anchor=(1.01, 1), fontsize=9)
+    fig.subplots_adjust(left=0.055, bottom=0.065, right=0.75, top=0.962)
+    _draw_footer(ax)
+    return fig
+
+
+def _draw_footer(ax):
+    # "Generated by Note Analyzer" in the bottom right corner
+    ax.text(
+        0.99, -0.15,
+        FOOTER_TEXT,
+        fontsize=8,
+        color="gray",
+        ha="right",
+        va="top",
+        transform=ax.transAxes
+    )
+
+
+def figure_bytes(fig, format="png", dpi=CHART_DPI):
+    """Save a chart once in ``format`` (``"png"``, ``"svg"``, ``"pdf"``, ...) and return the bytes."""
+    canvas = fig.canvas if isinstance(fig.canvas, FigureCanvasAgg) else FigureCanvasAgg(fig)
+    buf = BytesIO()
+    canvas.print_figure(buf, format=format, dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def figure_png(fig, dpi=CHART_DPI):
+    """Rasterize a chart once and return the PNG bytes."""
+    return figure_bytes(fig, "png", dpi)
+
+
+def render_chart_png(histogram, stats, my_note, lecture_name, perfect_score,
+                     note_s_axis_diff, amount_s_axis_diff, language="english", dpi=CHART_DPI, pool=None,
+                     diagnostics=None, format="png"):
+    """Build and rasterize the chart, free its figure and return the PNG bytes.
+
+    With a ``pool`` the figure is borrowed from it and handed back cleared,
+    otherwise a throwaway figure is cleared before returning. Building and
+    rasterizing are measured in ``diagnostics`` when given. Other
+    ``format``s that matplotlib can save, such as ``"svg"`` or ``"pdf"``,
+    are returned instead of PNG when asked for.
+    """
+    fig = pool.acquire() if pool is not None else new_figure()
+    try:
+        with phase(diagnostics, "figure", len(histogram.counts)):
+            build_figure(histogram, stats, my_note, lecture_name, perfect_score,
+                         note_s_axis_diff, amount_s_axis_diff, language, fig=fig)
+        with phase(diagnostics, "rasterize", dpi=dpi, format=format):
+            return figure_bytes(fig, format, dpi)
+    finally:
+        if pool is not None:
+            pool.release(fig)
+        else:
+            fig.clear()
+
+
+def render_comparison_png(comparison, perfect_score, note_s_axis_diff, amount_s_axis_diff,
+                          language="english", dpi=CHART_DPI, pool=None, diagnostics=None):
+    """Like ``render_chart_png``, for the chart of a ``CourseComparison``."""
+    fig = pool.acquire() if pool is not None else new_figure()
+    try:
+        with phase(diagnostics, "figure", comparison.counts.size):
+            build_comparison_figure(comparison, perfect_score, note_s_axis_diff, amount_s_axis_diff, language,
+                                    fig=fig)
+        with phase(diagnostics, "rasterize", dpi=dpi):
+            return figure_png(fig, dpi)
+    finally:
+        if pool is not None:
+            pool.release(fig)
+        else:
+            fig.clear()
+
+
+def get_render_pool():
+    """Return the process pool that charts are rasterized in.
+
+    Agg drawing holds the GIL, so charts of concurrent sessions only render
+    side by side in separate processes. Workers are started with ``spawn``
+    and keep their own ``figure_pool``.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        return _render_pool
+
+
+def _discard_render_pool(pool):
+    # A worker that dies breaks its whole pool; the next chart starts a new one
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+
+
+def _discard_if_broken(pool, future):
+    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        _discard_render_pool(pool)
+
+
+def _render_in_worker(render, args, dpi, trace_memory=None):
+    # trace_memory is None unless the caller collects diagnostics, then the
+    # records measured here are sent back with the PNG
+    if trace_memory is None:
+        return render(*args, dpi=dpi, pool=figure_pool)
+    with Diagnostics(trace_memory) as diagnostics:
+        png = render(*args, dpi=dpi, pool=figure_pool, diagnostics=diagnostics)
+    return png, diagnostics.records
+
+
+def _submit_to_pool(executor, *args):
+    # Submit to executor, or to the shared render pool when it is None. A
+    # shared pool found broken is replaced and the chart submitted again; a
+    # worker dying during the render drops the pool, so the chart fails but
+    # the next one gets a working pool
+    if executor is not None:
+        return executor.submit(_render_in_worker, *args)
+    pool = get_render_pool()
+    try:
+        future = pool.submit(_render_in_worker, *args)
+    except BrokenProcessPool:
+        _discard_render_pool(pool)
+        pool = get_render_pool()
+        future = pool.submit(_render_in_worker, *args)
+    future.add_done_callback(partial(_discard_if_broken, pool))
+    return future
+
+
+def _submit(executor, render, args, dpi, diagnostics):
+    if diagnostics is None:
+        return _submit_to_pool(executor, render, args, dpi)
+
+    # Hand out a Future of the PNG alone and fold the worker's records in
+    # before it completes
+    future = Future()
+
+    def done(measured):
+        try:
+            png, records = measured.result()
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        diagnostics.extend(records)
+        future.set_result(png)
+
+    _submit_to_pool(executor, render, args, dpi, diagnostics.trace_memory).add_done_callback(done)
+    return future
+
+
+def _submit_cached(cache, key, submit, diagnostics, format, dpi):
+    # A completed Future of the bytes cached under key, or submit() with its
+    # result stored under key once it is done
+    with phase(diagnostics, "export cache", format=format, dpi=dpi) as detail:
+        data = cache.get(key)
+        detail["hit"] = data is not None
+    if data is not None:
+        future = Future()
+        future.set_result(data)
+        return future
+
+    def store(rendered):
+        if not rendered.cancelled() and rendered.exception() is None:
+            cache.put(key, rendered.result(), len(rendered.result()))
+
+    future = submit()
+    future.add_done_callback(store)
+    return future
+
+
+def submit_chart(histogram, stats, my_note, lecture_name, perfect_score,
+                 note_s_axis_diff, amount_s_axis_diff, language="english", dpi=CHART_DPI, executor=None,
+                 diagnostics=None, format="png", cache=None):
+    """Render the chart in ``executor`` (the render pool by default).
+
+    Returns a ``Future`` whose result is the PNG bytes, or the chart in
+    another ``format`` such as ``"svg"`` or ``"pdf"``. Finished charts are
+    kept in ``cache`` (the shared ``export_cache`` by default) under a hash
+    of the bars plus every other argument, so asking for the same chart
+    again returns a completed ``Future`` without rendering anything.
+
+    With ``diagnostics`` the cache lookup and the stages measured in the
+    worker are added to it before the ``Future`` completes.
+    """
+    cache = export_cache if cache is None else cache
+    args = (histogram, stats, my_note, lecture_name, perfect_score,
+            note_s_axis_diff, amount_s_axis_diff, language)
+    key = (_bars_digest(histogram), histogram.width, histogram.align,
+           (stats.count, stats.mean, stats.m2, stats.min, stats.max), *args[2:], format, dpi)
+    return _submit_cached(cache, key,
+                          partial(_submit, executor, partial(render_chart_png, format=format), args, dpi, diagnostics),
+                          diagnostics, format, dpi)
+
+
+def export_chart(histogram, stats, my_note, lecture_name, perfect_score,
+                 note_s_axis_diff, amount_s_axis_diff, language="english", format="png", dpi=CHART_DPI,
+                 executor=None, cache=None):
+    """Return the chart as ``format`` bytes, rendering it only if it is not cached.
+
+    Meant to be handed to a download button, so nothing is rendered until
+    the chart is downloaded. A ``dpi`` of ``None`` means ``CHART_DPI``; in
+    the vector formats it only sets the resolution of raster parts.
+    """
+    return submit_chart(histogram, stats, my_note, lecture_name, perfect_score, note_s_axis_diff,
+                        amount_s_axis_diff, language, dpi or CHART_DPI, executor, format=format,
+                        cache=cache).result()
+
+
+def submit_comparison(comparison, perfect_score, note_s_axis_diff, amount_s_axis_diff,
+                      language="english", dpi=CHART_DPI, executor=None, diagnostics=None, cache=None):
+    """Render the chart of a ``CourseComparison`` like ``submit_chart``.
+
+    The chart does not show ``my_note`` or the lecture name, so changing
+    them finds it in ``cache`` (the shared ``export_cache`` by default).
+    """
+    cache = export_cache if cache is None else cache
+    args = (comparison, perfect_score, note_s_axis_diff, amount_s_axis_diff, language)
+    key = (_comparison_digest(comparison), *args[1:], "png", dpi)
+    return _submit_cached(cache, key, partial(_submit, executor, render_comparison_png, args, dpi, diagnostics),
+                          diagnostics, "png", dpi)
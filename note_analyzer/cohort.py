@@ -0,0 +1,121 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .parsing import ParseReport, read_grade_column
+from .stats import NoteStatistics
+
+# Lowest grade of every letter band as a percentage of the perfect score,
+# from the best band down
+LETTER_BANDS = (("A", 90), ("B", 80), ("C", 70), ("D", 60), ("F", 0))
+
+# CSV header of the student table for every language of the app
+COHORT_HEADERS = {
+    "turkish": ("Sıra", "Satır", "Kimlik", "Not", "Z-Skoru", "Yüzdelik Sıra", "Harf Notu"),
+    "english": ("Row", "Line", "ID", "Score", "Z-Score", "Percentile", "Letter"),
+    "arabic": ("الترتيب", "السطر", "المعرّف", "الدرجة", "درجة Z", "الرتبة المئينية", "التقدير"),
+}
+
+# Rows formatted per block while writing the CSV
+_CSV_BLOCK = 1 << 16
+
+# Every grade in input order with its z-score, percentile rank and letter band,
+# and optionally the source line and row id of every grade. Missing grades
+# are NaN and get NaN scores and an empty band.
+CohortTable = namedtuple("CohortTable", ["notes", "z_scores", "percentiles", "bands", "lines", "ids"],
+                         defaults=(None, None))
+
+
+def percentile_ranks(notes):
+    """Return the percentile rank of every grade in O(n log n).
+
+    The rank counts the grades below plus half of the grades equal to it,
+    so equal grades share one rank and the whole cohort averages to 50.
+    """
+    notes = np.asarray(notes, dtype=np.float64)
+    ordered = np.sort(notes)
+    # Where every distinct grade starts and ends in the sorted order. Looking
+    # grades up among the distinct ones keeps the binary search in cache.
+    starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+    ends = np.append(starts[1:], len(ordered))
+    index = np.searchsorted(ordered[starts], notes)
+    return (starts[index] + ends[index]) * (50.0 / len(notes))
+
+
+def letter_bands(notes, perfect_score=100, bands=LETTER_BANDS):
+    """Return the letter band of every grade as an array of strings."""
+    labels = np.array([label for label, _ in reversed(bands)])
+    lowest = np.array([percent for _, percent in reversed(bands)], dtype=np.float64) * (perfect_score / 100)
+    index = np.searchsorted(lowest, notes, side="right") - 1
+    return labels[np.maximum(index, 0)]
+
+
+def cohort_table(notes, stats=None, perfect_score=100, bands=LETTER_BANDS, lines=None, ids=None):
+    """Compute the z-score, percentile rank and letter band of every grade at once.
+
+    NaN grades stand for missing ones: they keep their row but are left
+    out of the statistics and ranks.
+    """
+    notes = np.asarray(notes, dtype=np.float64)
+    present = ~np.isnan(notes)
+    graded = notes[present]
+    if stats is None:
+        stats = NoteStatistics.from_values(graded)
+    z_scores = np.full(len(notes), np.nan)
+    if stats.std:
+        z_scores[present] = (graded - stats.mean) / stats.std
+    # Without spread everyone has the same grade, like NoteStatistics.z_score the z-score is undefined
+    percentiles = np.full(len(notes), np.nan)
+    band_labels = np.full(len(notes), "", dtype=object)
+    if len(graded):
+        percentiles[present] = percentile_ranks(graded)
+        band_labels[present] = letter_bands(graded, perfect_score, bands)
+    return CohortTable(notes, z_scores, percentiles, band_labels, lines, ids)
+
+
+def _csv_field(text):
+    # Quote a free text cell when it holds a separator or a quote
+    if "," in text or '"' in text:
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _number(value, spec):
+    # Missing values are written as empty cells
+    return "" if value != value else format(value, spec)
+
+
+def table_csv(table, header=COHORT_HEADERS["english"]):
+    """Write a ``CohortTable`` as UTF-8 CSV bytes, one row per student.
+
+    Rows are numbered in input order, missing grades included, next to the
+    source line and row id when the table has them.
+    """
+    count = len(table.notes)
+    source_lines = table.lines.tolist() if table.lines is not None else [""] * count
+    ids = [_csv_field(row_id) for row_id in table.ids] if table.ids is not None else [""] * count
+    lines = [",".join(header)]
+    for start in range(0, count, _CSV_BLOCK):
+        end = start + _CSV_BLOCK
+        rows = zip(range(start + 1, end + 1), source_lines[start:end], ids[start:end],
+                   table.notes[start:end].tolist(), table.z_scores[start:end].tolist(),
+                   table.percentiles[start:end].tolist(), table.bands[start:end].tolist())
+        lines.extend(f"{row},{line},{row_id},{_number(note, 'g')},{_number(z, '.4f')},{_number(percentile, '.2f')},"
+                     f"{band}" for row, line, row_id, note, z, percentile, band in rows)
+    lines.append("")
+    return "\r\n".join(lines).encode("utf-8")
+
+
+def cohort_csv(data, first_step=0, increase_amount=1, perfect_score=100, language="english"):
+    """Parse grades like the app does and return the student table as CSV bytes.
+
+    There is one row per input row, in input order, with the line of its
+    grade and the first field of the row (the student id of "id name grade"
+    layouts). Missing-value markers and tokens that are not grades keep
+    their row with empty cells.
+    """
+    column = read_grade_column(data, first_step, increase_amount, report=ParseReport(limit=0))
+    if np.isnan(column.values).all():
+        raise ValueError("No grades found in the input")
+    table = cohort_table(column.values, perfect_score=perfect_score, lines=column.lines, ids=column.ids)
+    return table_csv(table, COHORT_HEADERS[language])
@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .cache import analyze_cached
+from .histogram import PERFECT_SCORE_BINS, freedman_diaconis_width, note_histogram, ragged_histogram
+from .parsing import ParseReport
+
+# Several courses summarized together: their names, NoteStatistics and
+# malformed token counts, plus the shared bin edges and a (courses, bins)
+# array of counts
+CourseComparison = namedtuple("CourseComparison", ["names", "stats", "malformed", "edges", "counts"])
+
+
+def comparison_bin_width(mode, values, bin_width=1.0, perfect_score=100, weights=None):
+    """Return the bin width shared by every course of a comparison.
+
+    The histogram modes of the single course chart map to one width: the
+    ``perfect_score`` bins, Freedman–Diaconis over all courses together, or
+    ``bin_width`` otherwise. Courses drawn on shared axes cannot have one
+    bar per grade, so the ``"unique"`` mode is binned by ``bin_width`` too.
+    ``weights`` counts every value that many times.
+    """
+    if mode == "perfect":
+        return perfect_score / PERFECT_SCORE_BINS
+    if mode == "fd":
+        unique_values, inverse = np.unique(values, return_inverse=True)
+        return freedman_diaconis_width(unique_values, np.bincount(inverse, weights=weights).astype(np.int64))
+    return bin_width
+
+
+def compare_courses(sources, first_step=0, increase_amount=1, mode="fixed", bin_width=1.0, perfect_score=100,
+                    source_ids=None, cache=None):
+    """Parse ``(name, content)`` pairs and summarize them as one ragged batch.
+
+    Every course goes through ``analyze_cached``, so a rerun that only
+    changes ``my_note`` or the texts parses nothing again; ``source_ids``
+    are handed on to it, one per source. The histograms of all courses are
+    then binned together in one vectorized pass over their distinct grades,
+    not a loop per course. Tokens that are not grades are skipped and
+    counted per course.
+    """
+    sources = list(sources)
+    if not sources:
+        raise ValueError("No courses to compare")
+    if source_ids is None:
+        source_ids = [None] * len(sources)
+
+    names, stats, malformed, unique_values, unique_counts = [], [], [], [], []
+    for (name, content), source_id in zip(sources, source_ids):
+        report = ParseReport(limit=0)
+        try:
+            course, values, counts = analyze_cached(content, first_step, increase_amount, report=report,
+                                                    histogram=note_histogram, source_id=source_id, cache=cache)
+        except ValueError as e:
+            # Say which course it was
+            raise ValueError(f"{name}: {e}") from None
+        names.append(name)
+        stats.append(course)
+        malformed.append(report.malformed_count)
+        unique_values.append(values)
+        unique_counts.append(counts)
+
+    values = np.concatenate(unique_values)
+    weights = np.concatenate(unique_counts)
+    lengths = [len(course_values) for course_values in unique_values]
+    width = comparison_bin_width(mode, values, bin_width, perfect_score, weights)
+    upper = perfect_score if mode == "perfect" else None
+    edges, counts = ragged_histogram(values, lengths, width, upper, weights)
+    return CourseComparison(names, stats, malformed, edges, counts)
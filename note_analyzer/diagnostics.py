@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+
+# One measured stage of an analysis: its name, wall time, the most memory it
+# allocated on top of what was already in use (``None`` without memory
+# tracing), the size of its input and a dict of extra details
+PhaseRecord = namedtuple("PhaseRecord", ["name", "seconds", "peak_bytes", "input_size", "detail"])
+
+# Structured records go here, one JSON document per analysis
+logger = logging.getLogger("note_analyzer.diagnostics")
+
+# Memory tracing slows every allocation of the process down, so only the
+# operator turns it on, with NOTE_ANALYZER_TRACE_MEMORY=1 in the environment
+TRACE_MEMORY = os.environ.get("NOTE_ANALYZER_TRACE_MEMORY", "").lower() in ("1", "true", "yes")
+
+class _OpenPhase:
+    # Traced memory at the start of a phase and the highest peak seen since
+    __slots__ = ("start_bytes", "peak")
+
+    def __init__(self, start_bytes):
+        self.start_bytes = start_bytes
+        self.peak = start_bytes
+
+
+# tracemalloc is one per process and shared by every Diagnostics in it:
+# the number of them tracing, whether tracing was started by them, and
+# every open phase of all of them
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+_open_phases = []
+
+
+def _start_tracing():
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        if not _tracing_users and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    # Tracing ends with the last user, and only if one of them started it
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if not _tracing_users and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+            _open_phases.clear()
+
+
+def _open_phase():
+    # The peak is reset for the new phase; every phase already open, of any
+    # session, keeps the peak it reached so far
+    with _tracing_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        for other in _open_phases:
+            other.peak = max(other.peak, peak)
+        tracemalloc.reset_peak()
+        measured = _OpenPhase(current)
+        _open_phases.append(measured)
+        return measured
+
+
+def _close_phase(measured):
+    # Return the most memory allocated on top of the start of the phase,
+    # None when tracing stopped before the phase ended
+    with _tracing_lock:
+        if measured not in _open_phases:
+            return None
+        _open_phases.remove(measured)
+        return max(measured.peak, tracemalloc.get_traced_memory()[1]) - measured.start_bytes
+
+
+class Diagnostics:
+    """Wall time, allocations and input size of every stage of one analysis.
+
+    Stages are measured with ``phase``; a stage entered several times, like
+    parsing one chunk after another, is folded into a single record whose
+    time and input size add up and whose peak is the largest one seen.
+
+    With ``trace_memory`` allocations are followed with ``tracemalloc``
+    between ``start`` (or ``__enter__``) and ``stop`` (or ``__exit__``).
+    Tracing is shared by every ``Diagnostics`` of the process: it starts
+    with the first of them and stops with the last, and a new phase never
+    wipes the peak another one is measuring. It slows every allocation of
+    the process down and sees the whole process, so peaks include whatever
+    other sessions allocate at the same time; servers leave it to the
+    operator with ``TRACE_MEMORY``. Work done in worker processes is not
+    seen.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._index = {}
+        self._tracing = False
+
+    def start(self):
+        if self.trace_memory and not self._tracing:
+            _start_tracing()
+            self._tracing = True
+        return self
+
+    def stop(self):
+        if self._tracing:
+            _stop_tracing()
+            self._tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def phase(self, name, input_size=None, **detail):
+        """Measure the ``with`` block as the stage ``name``.
+
+        The block gets the ``detail`` dict and can add what it found out,
+        such as whether a cache lookup hit, or under ``"input_size"`` the
+        size of an input only known once it has been read.
+        """
+        detail = dict(detail)
+        measured = _open_phase() if self._tracing else None
+        start = time.perf_counter()
+        try:
+            yield detail
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = None if measured is None else _close_phase(measured)
+            input_size = detail.pop("input_size", input_size)
+            self.record(name, seconds, peak_bytes, input_size, **detail)
+
+    def record(self, name, seconds, peak_bytes=None, input_size=None, **detail):
+        """Add a stage measured elsewhere, for example in a worker process."""
+        index = self._index.get(name)
+        if index is None:
+            self._index[name] = len(self.records)
+            self.records.append(PhaseRecord(name, seconds, peak_bytes, input_size, detail))
+            return
+        old = self.records[index]
+        if old.peak_bytes is not None or peak_bytes is not None:
+            peak_bytes = max(old.peak_bytes or 0, peak_bytes or 0)
+        if old.input_size is not None or input_size is not None:
+            input_size = (old.input_size or 0) + (input_size or 0)
+        detail = {**old.detail, **detail, "calls": old.detail.get("calls", 1) + 1}
+        self.records[index] = PhaseRecord(name, old.seconds + seconds, peak_bytes, input_size, detail)
+
+    def extend(self, records):
+        """Fold the records of another ``Diagnostics`` into this one."""
+        for record in records:
+            self.record(record.name, record.seconds, record.peak_bytes, record.input_size, **record.detail)
+
+    def as_dict(self, **context):
+        """Return the records as plain data, with ``context`` such as the input name added on top."""
+        return {
+            **context,
+            "trace_memory": self.trace_memory,
+            "phases": [record._asdict() for record in self.records],
+        }
+
+    def to_json(self, **context):
+        """Return ``as_dict`` as a JSON string."""
+        return json.dumps(self.as_dict(**context), ensure_ascii=False, default=str)
+
+    def log(self, level=logging.INFO, **context):
+        """Send the records to the ``note_analyzer.diagnostics`` logger as one JSON message.
+
+        The same data is attached to the log record as ``diagnostics`` for
+        handlers that format records themselves.
+        """
+        if logger.isEnabledFor(level):
+            logger.log(level, self.to_json(**context), extra={"diagnostics": self.as_dict(**context)})
+
+
+def phase(diagnostics, name, input_size=None, **detail):
+    """Return ``diagnostics.phase(...)``, or a no-op context when ``diagnostics`` is ``None``.
+
+    Either way the ``with`` block gets a ``detail`` dict it may fill in.
+    """
+    if diagnostics is None:
+        return nullcontext(detail)
+    return diagnostics.phase(name, input_size, **detail)
@@ -0,0 +1,50 @@
+"""Tutorial images of the landing page, prepared once per process."""
+
+import os
+from functools import lru_cache
+from io import BytesIO
+
+# Streamlit resizes wider images on every rerun, so they are shrunk once here
+MAX_IMAGE_WIDTH = 1460
+
+# The tutorial screenshots look the same with a 256 colour palette at about
+# a third of the size
+PALETTE_COLORS = 256
+
+
+@lru_cache(maxsize=None)
+def load_image(path, max_width=MAX_IMAGE_WIDTH):
+    """Return the image at ``path`` as compact PNG bytes, or ``None`` if it is missing.
+
+    The image is shrunk to ``max_width`` and stored with a colour palette;
+    the file is kept as it is when that does not make it smaller. Results
+    stay cached for the lifetime of the process.
+    """
+    if not os.path.isfile(path):
+        return None
+
+    from PIL import Image
+
+    with open(path, "rb") as f:
+        original = f.read()
+    image = Image.open(BytesIO(original))
+    unchanged = image.format == "PNG" and image.width <= max_width
+
+    if image.width > max_width:
+        height = max(1, round(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.LANCZOS)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    buf = BytesIO()
+    image.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE).save(buf, format="PNG", optimize=True)
+    data = buf.getvalue()
+    if unchanged and len(original) <= len(data):
+        return original
+    return data
+
+
+def tutorial_images(paths, max_width=MAX_IMAGE_WIDTH):
+    """Return the cached bytes of every image in ``paths`` that exists."""
+    images = (load_image(path, max_width) for path in paths)
+    return [image for image in images if image is not None]
@@ -0,0 +1,16 @@
+# Choices offered by the app sidebar. Kept free of NumPy and matplotlib so
+# the sidebar can be drawn before any analysis module is imported.
+
+# How the distribution chart groups the grades into bars
+HISTOGRAM_MODES = ("unique", "fixed", "fd", "perfect")
+
+# Where the distribution chart is drawn: rasterized on the server, or sent to
+# the browser as bar counts and drawn there
+CHART_MODES = ("image", "browser")
+
+# Formats the distribution chart can be downloaded in, as (format, dpi). The
+# dpi only matters for PNG, the vector formats leave it to the chart module.
+EXPORT_FORMATS = (("png", 150), ("png", 300), ("png", 600), ("svg", None), ("pdf", None))
+
+# MIME type of every download format
+EXPORT_MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf"}
@@ -0,0 +1,234 @@
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from io import BytesIO
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .diagnostics import phase
+from .histogram import merge_histograms, note_histogram
+from .parsing import CHUNK_SIZE, ParseReport, _token_mask, iter_note_chunks
+from .pipeline import analyze_stream, summarize_chunks
+
+# Inputs smaller than this are parsed in the calling process
+PARALLEL_MIN_BYTES = 32 << 20
+
+# Every shard gets at least this many bytes
+MIN_SHARD_SIZE = 8 * CHUNK_SIZE
+
+_SEPARATOR = re.compile(rb"[ \t\n\r\v\f]")
+
+# A bytes input copied into the shared memory block ``name``, so workers get
+# a name and a byte range instead of a pickled slice of the upload
+_SharedBytes = namedtuple("_SharedBytes", ["name"])
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Return a process pool shared by every analysis of this process.
+
+    Workers are started with ``spawn`` so the pool is safe to use from the
+    threads of a Streamlit server.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_process_pool(pool):
+    # A worker that dies breaks its whole pool; the next analysis starts a new one
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def _map(pool, func, *iterables):
+    # pool.map into a list, or on the shared pool when pool is None. A
+    # broken shared pool is replaced and the work run once more.
+    if pool is not None:
+        return list(pool.map(func, *iterables))
+    for attempt in range(2):
+        shared = get_process_pool()
+        try:
+            return list(shared.map(func, *iterables))
+        except BrokenProcessPool:
+            _discard_process_pool(shared)
+            if attempt:
+                raise
+
+
+def shard_bounds(data, shards):
+    """Split ``data`` into at most ``shards`` ``(start, end)`` byte ranges.
+
+    Every boundary is moved forward to the next whitespace byte, so no token
+    is cut between two shards.
+    """
+    size = len(data)
+    bounds = []
+    start = 0
+    for i in range(1, shards):
+        match = _SEPARATOR.search(data, max(size * i // shards, start))
+        if match is None:
+            break
+        end = match.start()
+        if end > start:
+            bounds.append((start, end))
+            start = end
+    bounds.append((start, size))
+    return bounds
+
+
+class _ShardReader:
+    # File-like view of the bytes [start, end) of a file or a memoryview
+    def __init__(self, source, start, end):
+        self.source = source
+        self.position = start
+        self.end = end
+
+    def read(self, size=-1):
+        if size < 0 or size > self.end - self.position:
+            size = self.end - self.position
+        if isinstance(self.source, memoryview):
+            data = bytes(self.source[self.position:self.position + size])
+        else:
+            self.source.seek(self.position)
+            data = self.source.read(size)
+        self.position += len(data)
+        return data
+
+
+@contextmanager
+def _open_shard(source, start, end):
+    # A path is re-opened in the worker, shared bytes are attached by name
+    if isinstance(source, _SharedBytes):
+        block = shared_memory.SharedMemory(source.name)
+        try:
+            yield _ShardReader(block.buf, start, end)
+        finally:
+            block.close()
+    else:
+        with open(source, "rb") as file:
+            yield _ShardReader(file, start, end)
+
+
+def _count_shard_tokens(source, start, end):
+    # Tokens are counted by their first byte, one chunk at a time; in_token
+    # tells whether the previous chunk ended inside a token
+    count = 0
+    in_token = False
+    with _open_shard(source, start, end) as stream:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            is_token = np.empty(len(chunk) + 1, dtype=bool)
+            is_token[0] = in_token
+            _token_mask(np.frombuffer(chunk, dtype=np.uint8), is_token[1:])
+            count += int(np.count_nonzero(is_token[1:] & ~is_token[:-1]))
+            in_token = bool(is_token[-1])
+    return count
+
+
+def _analyze_shard(source, start, end, offset, token_index, first_step, increase_amount, chunk_size, histogram):
+    report = ParseReport()
+    with _open_shard(source, start, end) as stream:
+        chunks = iter_note_chunks(stream, first_step, increase_amount, chunk_size, report,
+                                  token_index=token_index, offset=offset)
+        stats, unique_values, counts = summarize_chunks(chunks, histogram)
+    return stats, unique_values, counts, report
+
+
+def parallel_analyze(source, first_step=0, increase_amount=1, workers=None, chunk_size=CHUNK_SIZE,
+                     report=None, pool=None, histogram=note_histogram, diagnostics=None):
+    """Parse a large input on several cores and return ``(stats, unique_values, counts)``.
+
+    ``source`` is a path or a bytes object. It is cut into shards at
+    whitespace, every shard is parsed and reduced in a process pool and the
+    partial statistics, histograms and reports are merged into the same
+    result ``analyze_stream`` gives. Small inputs are parsed in place.
+
+    Workers only get a byte range: they re-open a path themselves, and
+    bytes are copied once into a shared memory block they read from, so
+    every worker holds one chunk at a time, never its whole shard.
+
+    With ``diagnostics`` the stages of an in-place parse are measured one by
+    one; the shards are measured as a whole, since their stages run in the
+    worker processes.
+    """
+    is_path = isinstance(source, (str, os.PathLike))
+    size = os.path.getsize(source) if is_path else len(source)
+    shards = min(workers or os.cpu_count() or 1, max(1, size // MIN_SHARD_SIZE))
+    if size < PARALLEL_MIN_BYTES or shards < 2:
+        if is_path:
+            with open(source, "rb") as file:
+                return analyze_stream(file, first_step, increase_amount, chunk_size, report, histogram, diagnostics)
+        return analyze_stream(BytesIO(source), first_step, increase_amount, chunk_size, report, histogram,
+                              diagnostics)
+
+    if is_path:
+        with open(source, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            bounds = shard_bounds(data, shards)
+        return _analyze_shards(source, bounds, first_step, increase_amount, chunk_size, report, pool, histogram,
+                               diagnostics)
+
+    block = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        block.buf[:size] = source
+        return _analyze_shards(_SharedBytes(block.name), shard_bounds(source, shards), first_step,
+                               increase_amount, chunk_size, report, pool, histogram, diagnostics)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _analyze_shards(source, bounds, first_step, increase_amount, chunk_size, report, pool, histogram,
+                    diagnostics):
+    # Parse every (start, end) range of source in the pool and merge the results
+    count = len(bounds)
+    size = bounds[-1][1]
+    shard_sources = [source] * count
+    starts = [start for start, _ in bounds]
+    ends = [end for _, end in bounds]
+
+    # With a stride every shard has to know how many tokens come before it
+    strided = (first_step, increase_amount) != (0, 1)
+    token_indices = [0] * count
+    if strided:
+        with phase(diagnostics, "count tokens", size, shards=count):
+            token_counts = _map(pool, _count_shard_tokens, shard_sources, starts, ends)
+        token_indices = np.cumsum([0] + token_counts[:-1]).tolist()
+
+    with phase(diagnostics, "shards", size, shards=count):
+        results = _map(pool, _analyze_shard, shard_sources, starts, ends, starts, token_indices,
+                       [first_step] * count, [increase_amount] * count, [chunk_size] * count, [histogram] * count)
+
+        stats, unique_values, counts = None, None, None
+        merged_report = ParseReport()
+        for shard_stats, shard_values, shard_counts, shard_report in results:
+            if stats is None:
+                stats, unique_values, counts = shard_stats, shard_values, shard_counts
+            else:
+                stats.merge(shard_stats)
+                unique_values, counts = merge_histograms(unique_values, counts, shard_values, shard_counts)
+
+            # Without a stride the shards count their tokens from zero
+            token_shift = 0 if strided else merged_report.token_count
+            merged_report.merge(shard_report, token_shift=token_shift, line_shift=merged_report.newline_count)
+
+    if report is not None:
+        report.merge(merged_report)
+    if not stats.count:
+        raise ValueError("No grades found in the input")
+    return stats, unique_values, counts
@@ -0,0 +1,309 @@
+from collections import namedtuple
+from io import BytesIO
+
+import numpy as np
+
+from .diagnostics import phase
+
+# Tokens that mark a missing grade and are skipped while parsing
+MISSING_VALUES = ('∅', "NA")
+_MISSING_BYTES = tuple(x.encode("utf-8") for x in MISSING_VALUES)
+
+# Bytes that separate two tokens: space and \t \n \v \f \r (9 to 13)
+WHITESPACE = b" \t\n\r\v\f"
+
+# Uploads are read in pieces of this many bytes
+CHUNK_SIZE = 1 << 20
+
+# Plain decimals up to this many bytes / digits are converted with NumPy,
+# anything else (exponents, "inf", very long tokens) falls back to float()
+_MAX_FAST_WIDTH = 24
+_MAX_FAST_DIGITS = 15
+_POWERS_OF_TEN = 10.0 ** np.arange(_MAX_FAST_WIDTH + 1)
+
+MalformedToken = namedtuple("MalformedToken", ["index", "line", "offset", "text"])
+
+# Every token of the grade column in input order, missing and malformed
+# grades as NaN, with the line it is on and the first field of its row
+# (``None`` when the grade is the first field)
+GradeColumn = namedtuple("GradeColumn", ["values", "lines", "ids"])
+
+
+class ParseReport:
+    """Collects the tokens that could not be read as a grade.
+
+    ``malformed_count`` counts all of them, ``malformed`` keeps the first
+    ``limit`` together with their token index, line and byte offset.
+    ``token_count`` and ``newline_count`` tell how much input was read.
+    """
+
+    def __init__(self, limit=100):
+        self.limit = limit
+        self.malformed = []
+        self.malformed_count = 0
+        self.token_count = 0
+        self.newline_count = 0
+
+    def add(self, token):
+        self.malformed_count += 1
+        if len(self.malformed) < self.limit:
+            self.malformed.append(token)
+
+    def merge(self, other, token_shift=0, line_shift=0):
+        """Append the report of a later part of the same input.
+
+        ``token_shift`` and ``line_shift`` move the token indices and line
+        numbers of ``other`` to where that part starts in the whole input.
+        """
+        for token in other.malformed[:self.limit - len(self.malformed)]:
+            self.malformed.append(token._replace(index=token.index + token_shift,
+                                                 line=token.line + line_shift))
+        self.malformed_count += other.malformed_count
+        self.token_count += other.token_count
+        self.newline_count += other.newline_count
+        return self
+
+
+def _check_stride(first_step, increase_amount):
+    # Negative values have no meaning for a column that is read chunk by chunk
+    if first_step < 0:
+        raise ValueError(f"first_step must be 0 or more, got {first_step}")
+    if increase_amount < 1:
+        raise ValueError(f"increase_amount must be 1 or more, got {increase_amount}")
+
+
+def _stride_start(token_index, first_step, increase_amount):
+    # Position of the first selected token in a run of tokens whose first
+    # token has the global index ``token_index``
+    if token_index <= first_step:
+        return first_step - token_index
+    return -(token_index - first_step) % increase_amount
+
+
+def _token_mask(buf, out):
+    # True for every byte of buf that is not whitespace
+    return np.logical_not((buf == ord(" ")) | (buf - np.uint8(9) <= 4), out=out)
+
+
+def _token_bounds(buf):
+    # Start and end offsets of every run of non-whitespace bytes. The mask is
+    # padded with a separator on both sides, so its edges alternate between
+    # token starts and token ends.
+    is_token = np.zeros(len(buf) + 2, dtype=bool)
+    _token_mask(buf, is_token[1:-1])
+    edges = np.flatnonzero(is_token[1:] != is_token[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def _convert_decimals(buf, starts, ends):
+    # Read [+-]digits[.digits] tokens column by column: every step looks at
+    # the next byte of all tokens at once. Returns the values and a mask of
+    # the tokens that had that simple form.
+    count = len(starts)
+    negative = buf[starts] == ord("-")
+    pos = starts + (negative | (buf[starts] == ord("+")))
+
+    mantissa = np.zeros(count)
+    digits = np.zeros(count, dtype=np.int8)
+    fraction_digits = np.zeros(count, dtype=np.int8)
+    dots = np.zeros(count, dtype=np.int8)
+    seen_dot = np.zeros(count, dtype=bool)
+    simple = ends - starts <= _MAX_FAST_WIDTH
+
+    last = len(buf) - 1
+    for _ in range(min(int((ends - starts).max()), _MAX_FAST_WIDTH)):
+        live = pos < ends
+        byte = buf[np.minimum(pos, last)]
+        digit = byte - np.uint8(ord("0"))
+        is_digit = (digit < 10) & live
+        is_dot = (byte == ord(".")) & live
+        simple &= ~live | is_digit | is_dot
+
+        np.multiply(mantissa, 10, out=mantissa, where=is_digit)
+        np.add(mantissa, digit, out=mantissa, where=is_digit)
+        digits += is_digit
+        fraction_digits += is_digit & seen_dot
+        seen_dot |= is_dot
+        dots += is_dot
+        pos += 1
+
+    simple &= (dots <= 1) & (digits >= 1) & (digits <= _MAX_FAST_DIGITS)
+
+    # An exact integer divided by an exact power of ten rounds the same way
+    # float() does
+    values = mantissa / _POWERS_OF_TEN[fraction_digits]
+    np.negative(values, out=values, where=negative)
+    return values, simple
+
+
+def _parse_buffer(data, token_index, offset, line, first_step, increase_amount, report, diagnostics=None):
+    # Parse one buffer of complete tokens; token_index, offset and line
+    # describe where the buffer starts in the whole input
+    buf = np.frombuffer(data, dtype=np.uint8)
+    with phase(diagnostics, "split", len(buf)):
+        starts, ends = _token_bounds(buf)
+    if not len(starts):
+        return np.array([], dtype=np.float64), 0
+
+    token_count = len(starts)
+    with phase(diagnostics, "convert", token_count):
+        values = _convert_column(data, buf, starts, ends, token_index, line, offset, first_step, increase_amount,
+                                 report)
+    return values, token_count
+
+
+def _convert_column(data, buf, starts, ends, token_index, line, offset, first_step, increase_amount, report,
+                    keep_missing=False):
+    # Convert the grade column of a buffer, skipping missing-value markers
+    # and tokens that are not numbers, or with keep_missing turning them
+    # into NaN so every value stays at the position of its token
+
+    # Only the column picked by first_step / increase_amount is converted,
+    # the other fields are skipped as bare offsets
+    first = _stride_start(token_index, first_step, increase_amount)
+    starts = starts[first::increase_amount]
+    ends = ends[first::increase_amount]
+    if not len(starts):
+        return np.array([], dtype=np.float64)
+
+    values, simple = _convert_decimals(buf, starts, ends)
+
+    keep = np.ones(len(values), dtype=bool)
+    newlines = None
+    for i in np.flatnonzero(~simple):
+        start, end = starts[i], ends[i]
+        token = bytes(data[start:end])
+        if token in _MISSING_BYTES:
+            keep[i] = False
+            continue
+        try:
+            # Decoded first: float() reads digits of any script from str, not from bytes
+            values[i] = float(token.decode("utf-8"))
+        except ValueError:
+            keep[i] = False
+            if newlines is None:
+                newlines = np.flatnonzero(buf == ord("\n"))
+            malformed = MalformedToken(
+                index=token_index + first + int(i) * increase_amount,
+                line=line + int(np.searchsorted(newlines, start)),
+                offset=offset + int(start),
+                text=token.decode("utf-8", errors="replace"),
+            )
+            if report is None:
+                raise ValueError(
+                    f"could not convert {malformed.text!r} to a grade "
+                    f"(token {malformed.index}, line {malformed.line})"
+                )
+            report.add(malformed)
+
+    if keep_missing:
+        values[~keep] = np.nan
+        return values
+    return values[keep]
+
+
+def tokenize_notes(data, first_step=0, increase_amount=1, report=None):
+    """Convert a bytes buffer of whitespace separated grades to a float array.
+
+    Spaces, tabs and ``\\r\\n`` all separate tokens and the ``MISSING_VALUES``
+    markers are skipped. Tokens that are not numbers raise ``ValueError``,
+    or are skipped and recorded in ``report`` when a ``ParseReport`` is given.
+    """
+    _check_stride(first_step, increase_amount)
+    values, _ = _parse_buffer(data, 0, 0, 1, first_step, increase_amount, report)
+    return values
+
+
+def iter_note_chunks(stream, first_step=0, increase_amount=1, chunk_size=CHUNK_SIZE, report=None,
+                     token_index=0, offset=0, diagnostics=None):
+    """Yield the grades of a binary stream as float arrays, one per chunk.
+
+    The stream is read ``chunk_size`` bytes at a time, so only one chunk and
+    the grades parsed from it are held in memory. A token cut in half at a
+    chunk boundary is carried over and parsed with the next chunk.
+
+    ``token_index`` and ``offset`` give the position of the stream in a
+    larger input when it is only one shard of it. Splitting and converting
+    are measured in ``diagnostics`` when given. ``first_step`` has to be 0
+    or more and ``increase_amount`` 1 or more, otherwise ``ValueError`` is
+    raised.
+    """
+    _check_stride(first_step, increase_amount)
+    start_index = token_index
+    line = 1
+    tail = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        data = tail + chunk
+
+        # Everything after the last separator may continue in the next chunk
+        cut = max(data.rfind(c) for c in WHITESPACE) + 1
+        tail = data[cut:]
+        if cut:
+            values, token_count = _parse_buffer(memoryview(data)[:cut], token_index, offset, line,
+                                                first_step, increase_amount, report, diagnostics)
+            if len(values):
+                yield values
+            token_index += token_count
+            offset += cut
+            line += data.count(b"\n", 0, cut)
+
+    if tail:
+        values, token_count = _parse_buffer(tail, token_index, offset, line,
+                                            first_step, increase_amount, report, diagnostics)
+        if len(values):
+            yield values
+        token_index += token_count
+
+    if report is not None:
+        report.token_count += token_index - start_index
+        report.newline_count += line - 1
+
+
+def read_notes(stream, first_step=0, increase_amount=1, chunk_size=CHUNK_SIZE, report=None):
+    """Read every grade of a binary stream into one float array."""
+    chunks = list(iter_note_chunks(stream, first_step, increase_amount, chunk_size, report))
+    if not chunks:
+        return np.array([], dtype=np.float64)
+    return np.concatenate(chunks)
+
+
+def parse_notes(content, first_step=0, increase_amount=1, report=None):
+    """Parse whitespace separated grades into a float array.
+
+    Every ``increase_amount``-th token starting at ``first_step`` is kept,
+    exactly like the sidebar inputs of the app.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return read_notes(BytesIO(content), first_step, increase_amount, report=report)
+
+
+def read_grade_column(content, first_step=0, increase_amount=1, report=None):
+    """Parse the grade column like ``parse_notes`` but keep where every grade came from.
+
+    Returns a ``GradeColumn`` with one entry per row of ``increase_amount``
+    tokens: missing-value markers and tokens that are not numbers are NaN
+    instead of being dropped, so the entries line up with the input rows.
+    The whole input is read at once.
+    """
+    _check_stride(first_step, increase_amount)
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    buf = np.frombuffer(content, dtype=np.uint8)
+    starts, ends = _token_bounds(buf)
+    values = _convert_column(content, buf, starts, ends, 0, 1, 0, first_step, increase_amount, report,
+                             keep_missing=True)
+    selected = np.arange(_stride_start(0, first_step, increase_amount), len(starts), increase_amount)
+    lines = np.searchsorted(np.flatnonzero(buf == ord("\n")), starts[selected]) + 1
+
+    ids = None
+    column = first_step % increase_amount
+    if column:
+        # Rows start ``column`` tokens before their grade
+        first_fields = selected - column
+        ids = [bytes(content[start:end]).decode("utf-8", errors="replace")
+               for start, end in zip(starts[first_fields].tolist(), ends[first_fields].tolist())]
+    return GradeColumn(values, lines, ids)
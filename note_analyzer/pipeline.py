@@ -0,0 +1,53 @@
+import numpy as np
+
+from .diagnostics import phase
+from .histogram import merge_histograms, note_histogram
+from .parsing import CHUNK_SIZE, iter_note_chunks
+from .stats import NoteStatistics
+
+
+def summarize_chunks(chunks, histogram=note_histogram, diagnostics=None):
+    """Fold an iterable of grade arrays into ``(stats, values, counts)``.
+
+    ``histogram`` counts one chunk, see ``histogram.chunk_histogram``. The
+    statistics and histogram stages are measured in ``diagnostics`` when given.
+    """
+    stats = NoteStatistics()
+    unique_values = np.array([], dtype=np.float64)
+    counts = np.array([], dtype=np.int64)
+    for notes_chunk in chunks:
+        with phase(diagnostics, "stats", len(notes_chunk)):
+            stats.update(notes_chunk)
+        with phase(diagnostics, "histogram", len(notes_chunk)):
+            chunk_values, chunk_counts = histogram(notes_chunk)
+            unique_values, counts = merge_histograms(unique_values, counts, chunk_values, chunk_counts)
+    return stats, unique_values, counts
+
+
+def analyze_stream(stream, first_step=0, increase_amount=1, chunk_size=CHUNK_SIZE, report=None,
+                   histogram=note_histogram, diagnostics=None):
+    """Parse a binary stream chunk by chunk and return ``(stats, unique_values, counts)``.
+
+    Each chunk is folded into a ``NoteStatistics`` accumulator and the
+    histogram as soon as it is parsed, so peak memory depends on the chunk
+    size and the number of distinct grades, not on the size of the input.
+    ``report`` and ``diagnostics`` are passed on to ``iter_note_chunks``.
+    """
+    chunks = iter_note_chunks(stream, first_step, increase_amount, chunk_size, report, diagnostics=diagnostics)
+    stats, unique_values, counts = summarize_chunks(chunks, histogram, diagnostics)
+    if not stats.count:
+        raise ValueError("No grades found in the input")
+    return stats, unique_values, counts
+
+
+def analyze_array(notes, histogram=note_histogram, chunk_size=CHUNK_SIZE):
+    """Return ``(stats, unique_values, counts)`` of an array of parsed grades.
+
+    The array is folded in slices of ``chunk_size`` grades, so a memory-mapped
+    array is read page by page instead of being copied into memory at once.
+    """
+    chunks = (notes[start:start + chunk_size] for start in range(0, len(notes), chunk_size))
+    stats, unique_values, counts = summarize_chunks(chunks, histogram)
+    if not stats.count:
+        raise ValueError("No grades found in the input")
+    return stats, unique_values, counts
@@ -0,0 +1,59 @@
+from io import BytesIO
+
+import numpy as np
+
+from .cache import content_hash
+from .histogram import chunk_histogram, merge_histograms, note_histogram
+from .parsing import iter_note_chunks
+from .pipeline import summarize_chunks
+from .stats import NoteStatistics
+
+
+class RunningAnalysis:
+    """Statistics and exact histogram of a grade set that grows in batches.
+
+    ``append`` parses only the new batch and folds it into the accumulator,
+    so an update costs time proportional to the new grades plus the number
+    of distinct grades, never to everything appended before.
+    """
+
+    def __init__(self):
+        self.stats = NoteStatistics()
+        self.values = np.array([], dtype=np.float64)
+        self.counts = np.array([], dtype=np.int64)
+        self.batches = 0
+        self._digests = set()
+
+    def append(self, data, first_step=0, increase_amount=1, report=None, diagnostics=None):
+        """Fold a batch of grades in and return ``True``.
+
+        A batch that was already appended with the same settings is skipped
+        and ``False`` is returned. A batch without grades raises ``ValueError``.
+        The stages of the parse are measured in ``diagnostics`` when given.
+        """
+        digest = (content_hash(data), first_step, increase_amount)
+        if digest in self._digests:
+            return False
+        chunks = iter_note_chunks(BytesIO(data), first_step, increase_amount, report=report, diagnostics=diagnostics)
+        stats, values, counts = summarize_chunks(chunks, note_histogram, diagnostics)
+        if not stats.count:
+            raise ValueError("No grades found in the input")
+
+        self.stats.merge(stats)
+        self.values, self.counts = merge_histograms(self.values, self.counts, values, counts)
+        self.batches += 1
+        self._digests.add(digest)
+        return True
+
+    def histogram(self, mode, bin_width=1.0, perfect_score=100):
+        """Return ``(values, counts)`` shaped like ``analyze_cached`` returns them for ``mode``.
+
+        The binned modes are counted from the exact histogram, so they can be
+        switched at any time without parsing the batches again.
+        """
+        if not self.stats.count:
+            raise ValueError("No grades found in the input")
+        histogram = chunk_histogram(mode, bin_width, perfect_score)
+        if histogram is note_histogram:
+            return self.values, self.counts
+        return histogram(self.values, weights=self.counts)
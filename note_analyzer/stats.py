@@ -0,0 +1,96 @@
+import numpy as np
+
+
+class NoteStatistics:
+    """Running count, mean, M2, min and max of a set of grades.
+
+    Chunks are folded in with ``update`` and accumulators built from other
+    chunks, files or processes are combined with ``merge`` (Chan et al.'s
+    parallel form of Welford's update), so a cohort never has to be held in
+    memory to be summarized.
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min=np.inf, max=-np.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+
+    @classmethod
+    def from_values(cls, values):
+        return cls().update(values)
+
+    def update(self, values):
+        """Fold an array of grades into the accumulator and return it.
+
+        The chunk is summarized with per-chunk vectorized reductions (mean,
+        squared deviations, min and max, each its own pass over the chunk)
+        and merged in with Chan's formula, so only one chunk is in memory.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return self
+        mean = values.mean()
+        deviations = values - mean
+        return self.merge(NoteStatistics(len(values), mean, np.dot(deviations, deviations),
+                                         values.min(), values.max()))
+
+    def merge(self, other):
+        """Fold another accumulator into this one and return it."""
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self):
+        return NoteStatistics(self.count, self.mean, self.m2, self.min, self.max)
+
+    @property
+    def variance(self):
+        # Population variance, the same as np.var / np.std with ddof=0
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def z_score(self, my_note):
+        return (my_note - self.mean) / self.std
+
+    def __repr__(self):
+        return (f"NoteStatistics(count={self.count}, mean={self.mean!r}, m2={self.m2!r}, "
+                f"min={self.min!r}, max={self.max!r})")
+
+
+def compute_statistics(notes_result):
+    """Return the summary statistics of an array of grades."""
+    return NoteStatistics.from_values(notes_result)
+
+
+def ragged_statistics(values, lengths):
+    """Return one ``NoteStatistics`` per group of a ragged batch of grades.
+
+    ``values`` holds the grades of all groups one after the other and
+    ``lengths`` how many belong to each, so every statistic of every group
+    comes out of a few ``reduceat`` reductions over the concatenated array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if (lengths <= 0).any():
+        raise ValueError("Every group needs at least one grade")
+
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    means = np.add.reduceat(values, starts) / lengths
+    deviations = values - np.repeat(means, lengths)
+    m2 = np.add.reduceat(deviations * deviations, starts)
+    mins = np.minimum.reduceat(values, starts)
+    maxs = np.maximum.reduceat(values, starts)
+    return [NoteStatistics(int(count), float(mean), float(dev), float(low), float(high))
+            for count, mean, dev, low, high in zip(lengths, means, m2, mins, maxs)]
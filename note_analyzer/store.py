@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .cache import content_hash
+from .parsing import MalformedToken, ParseReport, parse_notes
+
+# Bumped whenever the files written by NotesStore change
+STORE_VERSION = 1
+
+
+class NotesStore:
+    """Directory of parsed grade arrays, reopened with memory mapping.
+
+    Every input is stored once per ``first_step`` / ``increase_amount`` as a
+    ``.npy`` file holding the parsed grades plus a small ``.json`` file with
+    the source hash, the parse settings and what the parse report found.
+    ``load`` maps the array read-only instead of reading it, so reopening
+    millions of grades takes about as long as opening a file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _paths(self, digest, first_step, increase_amount):
+        stem = os.path.join(self.directory, f"{digest}-{first_step}-{increase_amount}")
+        return stem + ".npy", stem + ".json"
+
+    def load(self, digest, first_step=0, increase_amount=1, report=None):
+        """Return the memory-mapped grades of ``digest`` or ``None`` when they are not stored.
+
+        The stored parse report is merged into ``report`` when given.
+        """
+        notes_path, meta_path = self._paths(digest, first_step, increase_amount)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["version"] != STORE_VERSION:
+                return None
+            notes = np.load(notes_path, mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if report is not None:
+            stored = ParseReport(limit=report.limit)
+            stored.malformed = [MalformedToken(*token) for token in meta["malformed"]][:report.limit]
+            stored.malformed_count = meta["malformed_count"]
+            stored.token_count = meta["token_count"]
+            stored.newline_count = meta["newline_count"]
+            report.merge(stored)
+        return notes
+
+    def save(self, notes, digest, first_step=0, increase_amount=1, report=None):
+        """Write ``notes`` and its metadata and return the path of the ``.npy`` file.
+
+        Both files are written under a temporary name and moved into place,
+        so a reader never maps a half-written array.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        notes_path, meta_path = self._paths(digest, first_step, increase_amount)
+        report = report or ParseReport(limit=0)
+        meta = {
+            "version": STORE_VERSION,
+            "source_hash": digest,
+            "first_step": first_step,
+            "increase_amount": increase_amount,
+            "count": len(notes),
+            "malformed_count": report.malformed_count,
+            "malformed": [list(token) for token in report.malformed],
+            "token_count": report.token_count,
+            "newline_count": report.newline_count,
+        }
+        self._write(notes_path, lambda f: np.save(f, np.asarray(notes, dtype=np.float64)))
+        self._write(meta_path, lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8")))
+        return notes_path
+
+    def _write(self, path, write):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def notes(self, data, first_step=0, increase_amount=1, report=None):
+        """Return the grades of ``data``, parsing and storing them the first time."""
+        digest = content_hash(data)
+        notes = self.load(digest, first_step, increase_amount, report)
+        if notes is not None:
+            return notes
+        parsed = ParseReport(limit=report.limit if report is not None else 100)
+        notes = parse_notes(data, first_step, increase_amount, report=parsed)
+        self.save(notes, digest, first_step, increase_amount, parsed)
+        if report is not None:
+            report.merge(parsed)
+        return notes
@@ -0,0 +1,47 @@
+"""Load the heavy parts of the engine ahead of the first analysis.
+
+Run ``python -m note_analyzer.warmup`` while building a container image to
+write matplotlib's font cache to disk, or call ``warm_up`` from a background
+thread when the server starts.
+"""
+
+import sys
+import time
+
+
+def warm_up(render_pool=True):
+    """Import NumPy and matplotlib, build the font cache and draw one chart.
+
+    With ``render_pool`` a chart is also sent to the render pool, so its
+    first worker is already started when a user asks for a chart. Returns
+    the seconds spent.
+    """
+    start = time.perf_counter()
+
+    import numpy as np
+    from matplotlib import font_manager
+
+    from .charts import render_chart_png, submit_chart
+    from .histogram import histogram_bars, note_histogram
+    from .stats import NoteStatistics
+
+    # Building the FontManager scans the system fonts once and caches them
+    font_manager.findfont(font_manager.FontProperties())
+
+    notes = np.array([40.0, 55.0, 55.0, 70.0, 85.0])
+    bars = histogram_bars("unique", *note_histogram(notes))
+    stats = NoteStatistics.from_values(notes)
+    chart = (bars, stats, 55.0, "", 100, 10, 1)
+    render_chart_png(*chart)
+    if render_pool:
+        try:
+            submit_chart(*chart).result()
+        except RuntimeError:
+            # The interpreter is shutting down and the pool no longer takes work
+            pass
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    seconds = warm_up(render_pool="--no-pool" not in sys.argv[1:])
+    print(f"warm-up finished in {seconds:.2f} s")
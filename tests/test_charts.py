@@ -0,0 +1,33 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from note_analyzer import (AnalysisCache, NoteStatistics, charts, export_chart, histogram_bars, note_histogram,
+                           submit_chart)
+
+
+def test_broken_render_pool_is_replaced():
+    notes = np.array([50.0, 60.0, 60.0, 70.0])
+    values, counts = note_histogram(notes)
+    args = (histogram_bars("unique", values, counts), NoteStatistics.from_values(notes), 60.0, "Course", 100, 5, 1)
+
+    # A worker dying breaks the shared pool for every later chart
+    broken = charts.get_render_pool()
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    png = submit_chart(*args, cache=AnalysisCache()).result()
+    assert png.startswith(b"\x89PNG")
+    assert charts.get_render_pool() is not broken
+
+
+def test_chart_is_exported_in_every_format():
+    notes = np.array([50.0, 60.0, 60.0, 70.0])
+    values, counts = note_histogram(notes)
+    args = (histogram_bars("unique", values, counts), NoteStatistics.from_values(notes), 60.0, "Course", 100, 5, 1)
+    cache = AnalysisCache()
+    assert export_chart(*args, format="svg", cache=cache).lstrip().startswith(b"<?xml")
+    assert export_chart(*args, format="pdf", cache=cache).startswith(b"%PDF")
+    assert export_chart(*args, format="png", dpi=300, cache=cache).startswith(b"\x89PNG")
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from note_analyzer import ParseReport, cohort_csv, cohort_table, read_grade_column
+
+
+def test_rows_keep_their_input_position():
+    data = b"101 Ali 55\n102 Veli NA\n103 Can 88\n"
+    rows = cohort_csv(data, first_step=2, increase_amount=3).decode("utf-8").splitlines()
+    assert rows[0] == "Row,Line,ID,Score,Z-Score,Percentile,Letter"
+    assert rows[2] == "2,2,102,,,,"
+    assert rows[3].startswith("3,3,103,88,")
+
+
+def test_malformed_grades_keep_their_row():
+    report = ParseReport()
+    column = read_grade_column(b"1,a x 50\n2 y abc\n3 z 70\n", 2, 3, report=report)
+    assert [token.line for token in report.malformed] == [2]
+    assert column.ids == ["1,a", "2", "3"]
+    assert column.lines.tolist() == [1, 2, 3]
+    assert np.isnan(column.values[1])
+    table = cohort_table(column.values, lines=column.lines, ids=column.ids)
+    assert table.bands.tolist() == ["F", "", "C"]
+    assert table.percentiles[[0, 2]].tolist() == [25.0, 75.0]
+
+
+def test_no_grades():
+    with pytest.raises(ValueError):
+        cohort_csv(b"NA NA")
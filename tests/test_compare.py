@@ -0,0 +1,52 @@
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from note_analyzer import AnalysisCache, compare_courses, submit_comparison
+
+SOURCES = [("a", b"50 60 60 70 80 x"), ("b", b"40 45.5 90 95"), ("c", b"55 65 75")]
+
+
+@pytest.mark.parametrize("mode", ["unique", "fixed", "fd", "perfect"])
+def test_courses_are_binned_together(mode):
+    comparison = compare_courses(SOURCES, mode=mode, bin_width=10, cache=AnalysisCache())
+    assert comparison.names == ["a", "b", "c"]
+    assert [s.count for s in comparison.stats] == [5, 4, 3]
+    assert comparison.malformed == [1, 0, 0]
+    assert comparison.counts.sum(axis=1).tolist() == [5, 4, 3]
+    assert comparison.stats[1].mean == pytest.approx(np.mean([40, 45.5, 90, 95]))
+
+
+def test_courses_are_parsed_once():
+    cache = AnalysisCache()
+    first = compare_courses(SOURCES, cache=cache)
+    again = compare_courses(SOURCES, cache=cache)
+    assert (cache.misses, cache.hits) == (3, 3)
+    np.testing.assert_array_equal(first.counts, again.counts)
+
+
+def test_course_without_grades_is_named():
+    with pytest.raises(ValueError, match="^b: "):
+        compare_courses([("a", b"50"), ("b", b"NA")], cache=AnalysisCache())
+
+
+class _Executor:
+    # Renders in the calling process and counts the charts it was given
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, func, *args):
+        self.submitted += 1
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+
+def test_comparison_chart_is_cached():
+    comparison = compare_courses(SOURCES, cache=AnalysisCache())
+    cache, executor = AnalysisCache(), _Executor()
+    png = submit_comparison(comparison, 100, 5, 1, executor=executor, cache=cache).result()
+    assert png.startswith(b"\x89PNG")
+    assert submit_comparison(comparison, 100, 5, 1, executor=executor, cache=cache).result() == png
+    assert executor.submitted == 1
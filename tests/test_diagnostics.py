@@ -0,0 +1,42 @@
+import tracemalloc
+
+from note_analyzer import Diagnostics
+
+
+def test_sessions_do_not_reset_each_others_peak():
+    first, second = Diagnostics(trace_memory=True).start(), Diagnostics(trace_memory=True)
+    with first.phase("parse"):
+        block = bytearray(80 << 20)
+        del block
+        # Another session starting, measuring and stopping in the meantime
+        with second:
+            with second.phase("read"):
+                pass
+        assert tracemalloc.is_tracing()
+    first.stop()
+
+    assert not tracemalloc.is_tracing()
+    assert first.records[0].peak_bytes >= 80 << 20
+    assert second.records[0].peak_bytes < 1 << 20
+
+
+def test_nested_phase_keeps_outer_peak():
+    with Diagnostics(trace_memory=True) as diagnostics:
+        with diagnostics.phase("analysis"):
+            block = bytearray(16 << 20)
+            del block
+            with diagnostics.phase("chart"):
+                pass
+    peaks = {record.name: record.peak_bytes for record in diagnostics.records}
+    assert peaks["analysis"] >= 16 << 20
+    assert peaks["chart"] < 1 << 20
+
+
+def test_time_without_memory_tracing():
+    diagnostics = Diagnostics().start()
+    with diagnostics.phase("read", 10) as detail:
+        detail["hit"] = False
+    diagnostics.stop()
+    assert not tracemalloc.is_tracing()
+    record = diagnostics.records[0]
+    assert (record.peak_bytes, record.input_size, record.detail) == (None, 10, {"hit": False})
@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from note_analyzer import Diagnostics, ParseReport, analyze_stream, parallel, parallel_analyze
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        yield pool
+
+
+def _grades(rows=3000, seed=0):
+    # "<id> <name> <grade>" rows with missing and malformed grades mixed in
+    rng = np.random.default_rng(seed)
+    grades = [f"{value:.1f}" for value in rng.uniform(0, 100, rows).tolist()]
+    for i in range(0, rows, 97):
+        grades[i] = "NA"
+    for i in range(5, rows, 211):
+        grades[i] = "x" + grades[i]
+    return "".join(f"{i} S{i} {grade}\n" for i, grade in enumerate(grades)).encode("utf-8")
+
+
+@pytest.mark.parametrize("first_step, increase_amount", [(0, 1), (2, 3)])
+def test_sharded_parse_matches_stream(monkeypatch, pool, first_step, increase_amount):
+    data = _grades()
+    # Small enough limits that this input is cut into several shards
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr(parallel, "MIN_SHARD_SIZE", len(data) // 4)
+
+    expected_report = ParseReport()
+    expected = analyze_stream(BytesIO(data), first_step, increase_amount, report=expected_report)
+    report, diagnostics = ParseReport(), Diagnostics()
+    stats, values, counts = parallel_analyze(data, first_step, increase_amount, workers=4, chunk_size=4096,
+                                             report=report, pool=pool, diagnostics=diagnostics)
+
+    assert "shards" in [record.name for record in diagnostics.records]
+    assert stats.count == expected[0].count
+    assert stats.mean == pytest.approx(expected[0].mean)
+    assert stats.std == pytest.approx(expected[0].std)
+    assert (stats.min, stats.max) == (expected[0].min, expected[0].max)
+    np.testing.assert_array_equal(values, expected[1])
+    np.testing.assert_array_equal(counts, expected[2])
+    assert report.malformed_count == expected_report.malformed_count
+    assert report.malformed == expected_report.malformed
+
+
+@pytest.mark.parametrize("chunk_size", [5, 4096])
+def test_shard_tokens_are_counted_across_chunks(monkeypatch, tmp_path, chunk_size):
+    data = _grades(300)
+    path = tmp_path / "grades.txt"
+    path.write_bytes(data)
+    monkeypatch.setattr(parallel, "CHUNK_SIZE", chunk_size)
+    start, end = 3, len(data) - 10
+    assert parallel._count_shard_tokens(str(path), start, end) == len(data[start:end].split())
+
+
+def test_sharded_path_matches_stream(monkeypatch, tmp_path, pool):
+    data = _grades()
+    path = tmp_path / "grades.txt"
+    path.write_bytes(data)
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr(parallel, "MIN_SHARD_SIZE", len(data) // 3)
+
+    expected = analyze_stream(BytesIO(data), 2, 3, report=ParseReport())
+    stats, values, counts = parallel_analyze(str(path), 2, 3, workers=3, report=ParseReport(), pool=pool)
+    assert stats.count == expected[0].count
+    np.testing.assert_array_equal(values, expected[1])
+    np.testing.assert_array_equal(counts, expected[2])
+
+
+def test_broken_shared_pool_is_replaced(monkeypatch):
+    data = _grades()
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr(parallel, "MIN_SHARD_SIZE", len(data) // 2)
+
+    # A worker dying breaks the shared pool for every later analysis
+    broken = parallel.get_process_pool()
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    stats, _, _ = parallel_analyze(data, workers=2, report=ParseReport())
+    assert stats.count == analyze_stream(BytesIO(data), report=ParseReport())[0].count
+    assert parallel.get_process_pool() is not broken
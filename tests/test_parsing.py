@@ -0,0 +1,58 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from note_analyzer import ParseReport, parse_notes, read_grade_column, read_notes
+
+
+def _decimal_tokens(count=4000, seed=0):
+    # Decimals in every form the vectorized converter reads itself
+    rng = np.random.default_rng(seed)
+    tokens = []
+    for _ in range(count):
+        digits = "".join(rng.choice(list("0123456789"), int(rng.integers(1, 17))))
+        dot = int(rng.integers(0, len(digits) + 1))
+        sign = rng.choice(["", "-", "+"])
+        tokens.append(sign + digits[:dot] + "." + digits[dot:] if rng.random() < 0.8 else sign + digits)
+    tokens += [".5", "5.", "-.5", "+5.", "007", "-0", "0.000", "000000000000001.5", "123456789012345",
+               "1234567890123456", "0.1", "0.3", "9007199254740993", "99.99999999999999"]
+    return tokens
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 20])
+def test_decimals_round_like_float(chunk_size):
+    tokens = _decimal_tokens()
+    separators = [" ", "\t", "\r\n", "  \n"]
+    data = "".join(token + separators[i % len(separators)] for i, token in enumerate(tokens)).encode("ascii")
+    notes = read_notes(BytesIO(data), chunk_size=chunk_size)
+    expected = np.array([float(token) for token in tokens])
+    # Compared bit for bit, so even the sign of zero has to match
+    assert notes.view(np.int64).tolist() == expected.view(np.int64).tolist()
+
+
+def test_unicode_digits_are_grades():
+    report = ParseReport()
+    notes = parse_notes("٥٠ １２ 7.5 ۹۰".encode("utf-8"), report=report)
+    assert notes.tolist() == [50.0, 12.0, 7.5, 90.0]
+    assert report.malformed_count == 0
+
+
+def test_invalid_utf8_is_malformed():
+    report = ParseReport()
+    notes = parse_notes(b"50 \xff\xfe 60", report=report)
+    assert notes.tolist() == [50.0, 60.0]
+    assert [token.index for token in report.malformed] == [1]
+
+
+def test_malformed_without_report_raises():
+    with pytest.raises(ValueError):
+        parse_notes(b"50 abc")
+
+
+@pytest.mark.parametrize("first_step, increase_amount", [(-1, 1), (0, 0), (0, -1)])
+def test_negative_stride_is_rejected(first_step, increase_amount):
+    with pytest.raises(ValueError):
+        parse_notes(b"1 2 3 4 5", first_step, increase_amount)
+    with pytest.raises(ValueError):
+        read_grade_column(b"1 2 3 4 5", first_step, increase_amount)
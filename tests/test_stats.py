@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from note_analyzer import NoteStatistics, ragged_statistics
+
+
+def _grades(count=10000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(65, 15, count).round(1)
+
+
+def _assert_matches(stats, values, rel=1e-12):
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(np.mean(values), rel=rel)
+    assert stats.std == pytest.approx(np.std(values), rel=rel)
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+@pytest.mark.parametrize("parts", [1, 2, 7, 100])
+def test_update_by_chunks_matches_numpy(parts):
+    values = _grades()
+    stats = NoteStatistics()
+    for chunk in np.array_split(values, parts):
+        stats.update(chunk)
+    _assert_matches(stats, values)
+
+
+@pytest.mark.parametrize("parts", [2, 7, 100])
+def test_merge_of_split_arrays_matches_numpy(parts):
+    values = _grades()
+    # Uneven parts, empty ones included, merged in a tree like shards would be
+    cuts = np.sort(np.random.default_rng(1).integers(0, len(values), parts - 1))
+    partials = [NoteStatistics.from_values(chunk) for chunk in np.split(values, cuts)]
+    while len(partials) > 1:
+        partials = [partials[i].merge(partials[i + 1]) if i + 1 < len(partials) else partials[i]
+                    for i in range(0, len(partials), 2)]
+    _assert_matches(partials[0], values)
+
+
+def test_large_offset_keeps_precision():
+    # Chan's update stays accurate where sum of squares minus square of sum would not
+    values = 1e9 + _grades(1000)
+    stats = NoteStatistics()
+    for chunk in np.array_split(values, 10):
+        stats.merge(NoteStatistics.from_values(chunk))
+    _assert_matches(stats, values, rel=1e-9)
+
+
+def test_ragged_statistics_match_numpy():
+    values = _grades(1000)
+    lengths = [1, 9, 490, 500]
+    groups = np.split(values, np.cumsum(lengths)[:-1])
+    for stats, group in zip(ragged_statistics(values, lengths), groups):
+        _assert_matches(stats, group)